@@ -13,6 +13,7 @@ from flask_cors import CORS
 from datetime import datetime
 from config import DevelopmentConfig, ProductionConfig
 from services.my_logger import log
+from services import database_access as api
 import os
 
 
@@ -33,6 +34,12 @@ def create_app():
         if 'api_mode' not in session:
             session['api_mode'] = 'local' if app.config.get('DEBUG') else 'remote'
 
+    # The blueprints bind the API server per request; release it so a reused worker thread
+    # never carries one admin's server choice into the next request
+    @app.teardown_request
+    def release_api_server(exc=None):
+        api.clear_server()
+
     return app
 
 
@@ -114,5 +121,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=5001,  # Different port than RRR_Server (5000)
         debug=True,
-        use_reloader=False
+        use_reloader=False,
+        threaded=True
     )
@@ -0,0 +1 @@
+"""Local RRR_Server stand-in and throughput benchmarks for the admin API client"""
@@ -0,0 +1,253 @@
+"""
+Throughput benchmark for the admin's API paths
+Drives process_pages, send_email_batches, the dashboard and the pricing uploads against the
+RRR_Server stand-in (or any server given with --server) and reports calls/sec plus p50/p99
+latency per scenario, measured by a database_access request hook.
+
+    python -m benchmarks.bench_client --latency 0.02 --pages 200
+    python -m benchmarks.bench_client --server http://127.0.0.1:5055/api/ --only dashboard
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks import pages as synthetic_pages
+from benchmarks import stub_server
+from services import database_access as api
+
+ZIPCODES = [90620, 91901, 91708, 90001, 91319, 91701, 96701, 96703, 96708, 96704]
+LOAN_TYPES = ["conventional-20", "conventional-5", "high balance-20", "high balance-5", "fha", "va", "jumbo"]
+
+
+class Recorder:
+    """Request hook that keeps every (endpoint, status, latency) sample of the running scenario"""
+
+    def __init__(self):
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def __call__(self, sample):
+        with self.lock:
+            self.samples.append((sample["endpoint"], sample["status"], sample["latency"]))
+
+    def take(self):
+        with self.lock:
+            samples, self.samples = self.samples, []
+        return samples
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(name, elapsed, samples, units, unit_name):
+    latencies = [latency for _, _, latency in samples]
+    return {
+        "scenario": name,
+        "seconds": round(elapsed, 3),
+        "calls": len(samples),
+        "calls_per_sec": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "failed": sum(1 for _, status, _ in samples if status >= 500),
+        "units": units,
+        "unit": unit_name,
+    }
+
+
+# ---- scenarios: each returns (units of work done, unit name) ----
+
+@contextlib.contextmanager
+def scratch_ingest_state(work):
+    """
+    Point the page folders, ingest manifest, write journal and page archive at the work dir,
+    so a benchmark run neither skips pages as already ingested nor writes into RRR_LOGS
+    """
+    from services import ingest_manifest, page_archive, process_listings, write_journal
+
+    settings = [
+        (process_listings, "PAGES_FOLDER", os.path.join(work, "pages")),
+        (process_listings, "PROCESSED_FOLDER", os.path.join(work, "processed")),
+        (process_listings, "FAILED_FOLDER", os.path.join(work, "failed")),
+        (ingest_manifest, "MANIFEST_PATH", os.path.join(work, "ingest_manifest.db")),
+        (write_journal, "JOURNAL_PATH", os.path.join(work, "api_journal.db")),
+        (page_archive, "ARCHIVE_FOLDER", os.path.join(work, "page_archive")),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in settings]
+    databases = [ingest_manifest, write_journal, page_archive]
+    saved_connections = [(module, module._conn) for module in databases]
+    for module, name, value in settings:
+        setattr(module, name, value)
+    for module in databases:
+        module._conn = None
+    try:
+        yield
+    finally:
+        for module in databases:
+            if module._conn is not None:
+                module._conn.close()
+        for module, name, value in saved:
+            setattr(module, name, value)
+        for module, conn in saved_connections:
+            module._conn = conn
+
+
+def bench_process_pages(args, state, parse_workers=None, api_workers=None):
+    from services import process_listings
+
+    work = tempfile.mkdtemp(prefix="rrr_bench_")
+    try:
+        with scratch_ingest_state(work):
+            synthetic_pages.write_pages(process_listings.PAGES_FOLDER, args.pages, start=state["page_start"],
+                                        seed=args.seed, agents=args.agents)
+            state["page_start"] += args.pages
+            summary = process_listings.process_pages(parse_workers=parse_workers, api_workers=api_workers)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return summary["succeeded"], "pages"
+
+
+def bench_process_pages_serial(args, state):
+    return bench_process_pages(args, state, parse_workers=1, api_workers=1)
+
+
+def bench_send_email_batches(args, state):
+    from services import workflow_runner
+
+    if state.get("stub_app") is not None:
+        state["stub_app"].stub_db.execute("UPDATE listings SET status = 'quoted' WHERE mls_number LIKE 'SEED%'")
+    workflow_runner.EMAIL_BATCH_DELAY = 0
+    return workflow_runner.send_email_batches(batch_size=args.email_batch), "emails"
+
+
+def bench_dashboard(args, state):
+    from app import app
+
+    client = app.test_client()
+    for _ in range(args.rounds):
+        api.clear_cache()
+        response = client.get("/admin/dashboard", environ_base={"REMOTE_ADDR": "127.0.0.1"})
+        if response.status_code != 200:
+            raise RuntimeError(f"dashboard returned {response.status_code}")
+    return args.rounds, "renders"
+
+
+def _price_rows():
+    for zipcode in ZIPCODES:
+        for loan_type in LOAN_TYPES:
+            yield {"listing_type": "house", "zipcode": zipcode, "loan_type": loan_type, "loan_amount": 800000,
+                   "dp_factor": 0.2, "rate": 6.125, "apr": 6.2, "points_credits": 0.5, "lender": "Bench",
+                   "mi_factor": 0}
+
+
+def bench_pricing_serial(args, state):
+    count = 0
+    for row in _price_rows():
+        _, status_code = api.add_daily_price(**row)
+        count += status_code == 201
+    return count, "rows"
+
+
+def bench_pricing_batched(args, state):
+    with api.daily_price_writer() as writer:
+        for row in _price_rows():
+            writer.add(row)
+    return sum(1 for _, _, status_code in writer.results if status_code == 201), "rows"
+
+
+def bench_dscr_batched(args, state):
+    with api.dscr_price_writer(batch_size=len(ZIPCODES)) as writer:
+        for ltv in (60, 65, 70, 75, 80):
+            for zipcode in ZIPCODES:
+                writer.add({"listing_type": "house", "zipcode": zipcode, "lender": "Bench", "rate": 7.25,
+                            "apr": 7.4, "ltv": ltv, "points_credits": 1, "interest_only": False, "min_fico": 780})
+    return sum(1 for _, _, status_code in writer.results if status_code == 201), "rows"
+
+
+SCENARIOS = {
+    "process_pages_serial": bench_process_pages_serial,
+    "process_pages": bench_process_pages,
+    "send_email_batches": bench_send_email_batches,
+    "dashboard": bench_dashboard,
+    "pricing_serial": bench_pricing_serial,
+    "pricing_batched": bench_pricing_batched,
+    "dscr_batched": bench_dscr_batched,
+}
+
+
+def run(args):
+    state = {"page_start": 0, "stub_app": None}
+    server = None
+    base_url = args.server
+    if not base_url:
+        server, base_url = stub_server.serve(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+        state["stub_app"] = server.app
+
+    # admin paths bind the server with set_server("local"/"remote") and fall back to SERVER_DB once a
+    # request is torn down, so point all three at the server under test
+    api.LOCAL_DB = api.REMOTE_DB = api.SERVER_DB = base_url
+
+    recorder = Recorder()
+    api.add_request_hook(recorder)
+    results = []
+    try:
+        for name in args.only or SCENARIOS:
+            api.set_server("local")
+            recorder.take()
+            output = io.StringIO() if args.quiet else None
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                units, unit_name = SCENARIOS[name](args, state)
+            elapsed = time.perf_counter() - started
+            results.append(summarize(name, elapsed, recorder.take(), units, unit_name))
+    finally:
+        api.remove_request_hook(recorder)
+        if server is not None:
+            server.shutdown()
+    return results
+
+
+def print_report(results):
+    print(f"{'scenario':<20}{'seconds':>9}{'calls':>7}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'5xx':>8}  work")
+    for r in results:
+        print(f"{r['scenario']:<20}{r['seconds']:>9}{r['calls']:>7}{r['calls_per_sec']:>9}{r['p50_ms']:>9}"
+              f"{r['p99_ms']:>9}{r['failed']:>8}  {r['units']} {r['unit']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RRR_Admin API paths against the RRR_Server stand-in")
+    parser.add_argument("--server", help="base API URL to benchmark instead of starting the stand-in")
+    parser.add_argument("--latency", type=float, default=0.005, help="stand-in latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="stand-in extra random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in fraction of 503 responses")
+    parser.add_argument("--pages", type=int, default=100, help="synthetic pages for process_pages")
+    parser.add_argument("--agents", type=int, default=40,
+                        help="agents the synthetic pages draw from (0 = a new agent on every page)")
+    parser.add_argument("--rounds", type=int, default=5, help="dashboard renders")
+    parser.add_argument("--email-batch", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=None, help="seed for the synthetic page generator")
+    parser.add_argument("--only", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", dest="quiet", action="store_false", help="keep the workflow log output")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Per-page microbenchmarks for listing extraction over the checked-in corpus (benchmarks/corpus)
+Times each extraction function on every corpus page, records its peak traced memory, checks
+get_details and parse_file still return the corpus' expected output, and writes everything to a
+JSON file so a parser change can be compared with the previous run:
+
+    python -m benchmarks.bench_extract
+    python -m benchmarks.bench_extract --compare benchmarks/results/extract_20250101_120000.json
+
+get_json_data became page_regions (the tree read) when extraction moved to a single parse, so
+that is what's timed in its place, next to page_extract.extract_regions (the byte-scan fast path).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.make_corpus import CORPUS_FOLDER
+from services import page_extract, process_listings, scrape_homes
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+
+
+def load_corpus(folder=CORPUS_FOLDER):
+    """[(file_name, case, path, html, expected)] in manifest order"""
+    with open(os.path.join(folder, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    corpus = []
+    for file_name, entry in manifest.items():
+        path = os.path.join(folder, file_name)
+        with open(path, encoding="utf-8") as f:
+            corpus.append((file_name, entry["case"], path, f.read(), entry["expected"]))
+    return corpus
+
+
+def page_calls(path, html):
+    """name -> zero-argument call for every function timed per page (inputs prepared up front)"""
+    regions = process_listings.page_regions(process_listings.parse_page(html))
+    json_data = json.loads(regions["json_text"])
+    property_data = next((item for item in json_data["@graph"] if "RealEstateListing" in item["@type"]), None)
+    return {
+        "page_regions": lambda: process_listings.page_regions(process_listings.parse_page(html)),
+        "extract_regions": lambda: page_extract.extract_regions(path),
+        "get_details": lambda: process_listings.get_details(html),
+        "parse_file": lambda: process_listings.parse_file(path),
+        "get_agents": lambda: process_listings.get_agents(regions["licenses"], property_data),
+        "extract_details_url_from_offers": lambda: process_listings.extract_details_url_from_offers(json_data),
+    }
+
+
+def measure(call, repeat):
+    """(per-call seconds, peak traced bytes of one call)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def measure_rename(corpus, repeat):
+    """rename_files_in_folder over a fresh copy of the corpus under generic names; timed per page"""
+    times, peak = [], 0
+    for run in range(repeat + 1):
+        folder = tempfile.mkdtemp(prefix="rrr_rename_")
+        try:
+            for index, (_, _, path, _, _) in enumerate(corpus):
+                shutil.copyfile(path, os.path.join(folder, f"page_{index}.html"))
+            if run < repeat:
+                started = time.perf_counter()
+                scrape_homes.rename_files_in_folder(folder)
+                times.append((time.perf_counter() - started) / len(corpus))
+            else:
+                tracemalloc.start()
+                try:
+                    scrape_homes.rename_files_in_folder(folder)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+    return times, peak
+
+
+def summarize(times, peak):
+    return {
+        "median_us": round(statistics.median(times) * 1e6, 1),
+        "min_us": round(min(times) * 1e6, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(repeat=5, folder=CORPUS_FOLDER):
+    corpus = load_corpus(folder)
+    functions = {}
+    mismatches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file_name, case, path, html, expected in corpus:
+            for name, call in page_calls(path, html).items():
+                times, peak = measure(call, repeat)
+                entry = functions.setdefault(name, {"pages": {}})
+                entry["pages"][case] = summarize(times, peak)
+
+            for name, result in (("get_details", process_listings.get_details(html)),
+                                 ("parse_file", process_listings.parse_file(path))):
+                if json.loads(json.dumps(result)) != expected:
+                    mismatches.append({"function": name, "case": case, "file": file_name})
+
+        times, peak = measure_rename(corpus, repeat)
+        functions["rename_files_in_folder"] = {"pages": {"all (per page)": summarize(times, peak)}}
+
+    for entry in functions.values():
+        pages = entry["pages"].values()
+        entry["median_us"] = round(statistics.median(page["median_us"] for page in pages), 1)
+        entry["peak_kb"] = max(page["peak_kb"] for page in pages)
+
+    return {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "html_parser": process_listings.HTML_PARSER,
+        "fast_path": process_listings.PAGE_FAST_PATH,
+        "repeat": repeat,
+        "pages": len(corpus),
+        "functions": functions,
+        "mismatches": mismatches,
+    }
+
+
+def print_report(results, previous=None):
+    print(f"{results['pages']} corpus pages, parser={results['html_parser']}, fast path={results['fast_path']}, "
+          f"repeat={results['repeat']}")
+    header = f"{'function':<34}{'median us/page':>15}{'peak KB':>10}"
+    print(header + (f"{'before us':>12}{'change':>9}" if previous else ""))
+    for name, entry in results["functions"].items():
+        line = f"{name:<34}{entry['median_us']:>15}{entry['peak_kb']:>10}"
+        old = (previous or {}).get("functions", {}).get(name)
+        if old:
+            change = (entry["median_us"] / old["median_us"] - 1) * 100 if old["median_us"] else 0.0
+            line += f"{old['median_us']:>12}{change:>+8.1f}%"
+        print(line)
+    print(f"output mismatches: {len(results['mismatches'])}")
+    for mismatch in results["mismatches"]:
+        print(f"  {mismatch['function']} on {mismatch['case']} ({mismatch['file']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page listing extraction microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per function and page")
+    parser.add_argument("--corpus", default=CORPUS_FOLDER)
+    parser.add_argument("--json", help="results file (default benchmarks/results/extract_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to show the change against")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.corpus)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(results, previous)
+
+    path = args.json
+    if not path:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        path = os.path.join(RESULTS_FOLDER, f"extract_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {path}")
+    if results["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Pages/sec for process_listings.get_details and the page_extract fast path against the original
+extraction, which parsed every page three times with html.parser. Each page's output is compared
+with the original's so the run also checks the listing and agents stay identical.
+
+    python -m benchmarks.bench_parse --pages 50 --padding 80
+    HTML_PARSER=lxml python -m benchmarks.bench_parse
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks import pages as synthetic_pages
+from services import page_extract, process_listings
+
+
+def original_get_details(html_content):
+    """The three-parse extraction as it was before parse_page (reference for output and speed)"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    json_soup = BeautifulSoup(html_content, "html.parser")
+    json_data = json.loads(json_soup.find("script", type="application/ld+json").string)
+    details_url = process_listings.extract_details_url_from_offers(json_data)
+    if not details_url:
+        canonical = soup.find("link", rel="canonical")
+        if canonical and canonical.get("href"):
+            details_url = canonical["href"]
+
+    property_data = next((item for item in json_data["@graph"] if "RealEstateListing" in item["@type"]), None)
+    address_data = property_data.get("mainEntity", {}).get("address", {})
+    city = address_data.get("addressLocality", "N/A").replace(' ', '-')
+    region = address_data.get("addressRegion", "N/A")
+    main_entity = property_data.get("mainEntity", {})
+
+    mls_number = "N/A"
+    spans = soup.find('p', class_="mls-number").find_all('span')
+    if len(spans) > 1:
+        mls_number = spans[1].text.strip()
+
+    listing = {
+        "mls_number": mls_number,
+        "city_state": '-'.join([city, region]).lower(),
+        "listing_type": "house" if main_entity.get("@type", "N/A") == "SingleFamilyResidence" else "condo",
+        "details_url": details_url,
+        "property_address": address_data.get("streetAddress", "N/A"),
+        "zipcode": address_data.get("postalCode", "N/A"),
+        "price": property_data.get("offers", {}).get("price", "0"),
+        "beds": main_entity.get("numberOfBedrooms", "0"),
+        "baths": main_entity.get("numberOfBathroomsTotal", "0"),
+        "sq_ft": main_entity.get("floorSize", {}).get("value", "0"),
+    }
+
+    agent_list = property_data.get("offers", {}).get("offeredBy", [])
+    if isinstance(agent_list, dict):
+        agent_list = [agent_list]
+    agents = []
+    for agent in agent_list:
+        name = str(agent.get("name", "N/A"))
+        agents.append({
+            "first_name": name.split(" ")[0],
+            "last_name": name.split(" ")[-1],
+            "company": agent.get("memberOf", {}).get("name", "N/A"),
+            "phone": agent.get("telephone", "N/A"),
+            "email_address": agent.get("email", "N/A"),
+            "license": ""
+        })
+    license_soup = BeautifulSoup(html_content, "html.parser")
+    for i, tag in enumerate(license_soup.find_all('span', class_='agent-information-license-number')):
+        if i < len(agents):
+            agents[i]["license"] = tag.text.replace("License #", "").strip()
+    return listing, agents
+
+
+def fast_get_details(html_content):
+    """The parse_file fast path on an in-memory page (falls back the same way)"""
+    regions = page_extract.scan_regions(html_content.encode("utf-8"))
+    if regions is None:
+        return process_listings.get_details(html_content)
+    return process_listings.details_from_regions(regions)
+
+
+def timed(extract, documents):
+    started = time.perf_counter()
+    results = [extract(html) for html in documents]
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing extraction (pages/sec)")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--padding", type=int, default=80, help="filler repeats per page (80 = ~1 MB)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    documents = [synthetic_pages.make_page(index, padding=args.padding)[1] for index in range(args.pages)]
+    megabytes = sum(len(html) for html in documents) / 1_000_000
+
+    before, expected = timed(original_get_details, documents)
+    with contextlib.redirect_stdout(io.StringIO()):
+        after, actual = timed(process_listings.get_details, documents)
+        fast, fast_actual = timed(fast_get_details, documents)
+
+    def mismatched(results):
+        return sum(1 for old, new in zip(expected, results)
+                   if json.dumps(old, sort_keys=True) != json.dumps(new, sort_keys=True))
+
+    mismatches = mismatched(actual) + mismatched(fast_actual)
+    results = {
+        "pages": args.pages,
+        "megabytes": round(megabytes, 1),
+        "parser": process_listings.HTML_PARSER,
+        "before_pages_per_sec": round(args.pages / before, 2),
+        "after_pages_per_sec": round(args.pages / after, 2),
+        "speedup": round(before / after, 2),
+        "fast_pages_per_sec": round(args.pages / fast, 2),
+        "fast_speedup": round(before / fast, 2),
+        "mismatches": mismatches,
+    }
+    print(f"{args.pages} pages ({results['megabytes']} MB), parser={results['parser']}")
+    print(f"before: {results['before_pages_per_sec']} pages/sec (3 full html.parser trees per page)")
+    print(f"after:  {results['after_pages_per_sec']} pages/sec (1 filtered tree)  x{results['speedup']}")
+    print(f"fast:   {results['fast_pages_per_sec']} pages/sec (byte scans, no tree)  x{results['fast_speedup']}")
+    print(f"output mismatches: {mismatches}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
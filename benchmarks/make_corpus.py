@@ -0,0 +1,60 @@
+"""
+Regenerate benchmarks/corpus: synthetic homes.com property pages covering the shapes
+process_listings has to handle, plus manifest.json with each page's case and the
+(listing, agents) the reference parser extracts from it. bench_extract checks against it.
+
+    python -m benchmarks.make_corpus
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+
+from benchmarks import pages as synthetic_pages
+
+CORPUS_FOLDER = os.path.join(os.path.dirname(__file__), "corpus")
+
+# case name -> make_page options; padding 4 is ~60 KB, "large" ~250 KB
+CASES = {
+    "single_agent_house": {"colister": False, "entity_type": "SingleFamilyResidence", "padding": 4},
+    "colister_house": {"colister": True, "entity_type": "SingleFamilyResidence", "padding": 4},
+    "single_agent_condo": {"colister": False, "entity_type": "Apartment", "padding": 4},
+    "colister_condo": {"colister": True, "entity_type": "Apartment", "padding": 4},
+    "missing_mls_house": {"colister": True, "entity_type": "SingleFamilyResidence", "mls": False, "padding": 4},
+    "missing_mls_condo": {"colister": False, "entity_type": "Apartment", "mls": False, "padding": 4},
+    "large_colister_house": {"colister": True, "entity_type": "SingleFamilyResidence", "padding": 20},
+}
+
+
+def write_corpus(folder=CORPUS_FOLDER, seed=2024):
+    from services import process_listings
+
+    os.makedirs(folder, exist_ok=True)
+    manifest = {}
+    for index, (case, options) in enumerate(CASES.items()):
+        file_name, html, _ = synthetic_pages.make_page(index, seed=seed, **options)
+        with open(os.path.join(folder, file_name), "w", encoding="utf-8", newline="") as f:
+            f.write(html)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = process_listings.get_details(html)
+        manifest[file_name] = {"case": case, "options": options, "bytes": len(html.encode("utf-8")),
+                               "expected": expected}
+    with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the listing extraction benchmark corpus")
+    parser.add_argument("--folder", default=CORPUS_FOLDER)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+    manifest = write_corpus(args.folder, args.seed)
+    for file_name, entry in manifest.items():
+        print(f"{entry['case']:<22}{entry['bytes']:>9}  {file_name}")
+
+
+if __name__ == "__main__":
+    main()
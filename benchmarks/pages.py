@@ -0,0 +1,103 @@
+"""
+Synthetic homes.com property pages shaped like the saved pages process_listings parses
+(ld+json @graph, canonical link, mls-number paragraph and agent license spans)
+"""
+
+import json
+import os
+import random
+
+CITIES = [("Buena Park", "CA", "90620"), ("Alpine", "CA", "91901"), ("Claremont", "CA", "91708"),
+          ("Los Angeles", "CA", "90001"), ("Chatsworth", "CA", "91319"), ("Ewa Beach", "HI", "96701")]
+
+FILLER = ("<div class=\"photo-strip\"><a href=\"https://www.homes.com/\"><img src=\"https://images.homes.com/x.jpg\" "
+          "alt=\"photo\"></a><span class=\"caption\">Photo</span></div>") * 40
+
+
+def make_agent(rng, index):
+    first = rng.choice(["Ann", "Bob", "Carla", "Dev", "Eve", "Frank", "Gina", "Hal"])
+    last = rng.choice(["Lee", "Park", "Nguyen", "Garcia", "Smith", "Kim", "Lopez", "Wong"])
+    return {
+        "@type": "RealEstateAgent",
+        "name": f"{first} {last}",
+        "telephone": f"714-555-{rng.randint(1000, 9999)}",
+        "email": f"{first.lower()}.{last.lower()}{index}@example.com",
+        "memberOf": {"@type": "Organization", "name": rng.choice(["Coastal Realty", "Summit Homes", "Keystone"])},
+    }
+
+
+def make_page(index, seed=None, colister=True, padding=1, agents=None, entity_type=None, mls=True):
+    """
+    Return (file_name, html, mls_number) for one synthetic property page.
+    padding repeats the filler markup; 80 gives a page of about 1 MB, the size of a real saved page.
+    agents draws the lister/co-lister from a pool of that many agents, like a real batch where the
+    same agents list many homes; by default every page has its own agents.
+    entity_type forces the mainEntity @type (SingleFamilyResidence/Apartment/...); mls=False leaves
+    out the mls-number paragraph.
+    """
+    rng = random.Random(index if seed is None else seed * 1000003 + index)
+    city, region, zipcode = rng.choice(CITIES)
+    mls_number = f"PW{25000000 + index}"
+    street = f"{rng.randint(100, 9999)} {rng.choice(['Oak', 'Maple', 'Pine', 'Cedar'])} St"
+    slug = f"{street.replace(' ', '-').lower()}-{city.replace(' ', '-').lower()}-{region.lower()}-{zipcode}/{index:x}"
+    url = f"https://www.homes.com/property/{slug}/"
+
+    agent_pool = agents
+    if agent_pool:
+        numbers = rng.sample(range(agent_pool), 2) if colister and agent_pool > 1 else [rng.randrange(agent_pool)]
+        agents = [make_agent(random.Random(f"agent-{number}"), number) for number in numbers]
+    else:
+        agents = [make_agent(rng, index * 2)]
+        if colister:
+            agents.append(make_agent(rng, index * 2 + 1))
+
+    graph = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "WebPage", "url": url, "name": street},
+            {
+                "@type": ["RealEstateListing", "Product"],
+                "offers": {"@type": "Offer", "price": rng.randrange(450000, 2500000, 1000), "url": url,
+                           "offeredBy": agents},
+                "mainEntity": {
+                    "@type": entity_type or rng.choice(["SingleFamilyResidence", "Apartment"]),
+                    "numberOfBedrooms": rng.randint(1, 6),
+                    "numberOfBathroomsTotal": rng.randint(1, 4),
+                    "floorSize": {"@type": "QuantitativeValue", "value": rng.randint(600, 4200)},
+                    "address": {"@type": "PostalAddress", "streetAddress": street, "addressLocality": city,
+                                "addressRegion": region, "postalCode": zipcode},
+                },
+            },
+        ],
+    }
+
+    licenses = "".join(
+        f"<div class=\"agent-information\"><span class=\"agent-information-license-number\">License # {rng.randint(1000000, 2999999)}</span></div>"
+        for _ in agents)
+
+    mls_paragraph = f"<p class=\"mls-number\"><span>MLS #</span><span>{mls_number}</span></p>" if mls else ""
+
+    html = (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{street}, {city}, {region} {zipcode}</title>"
+        f"<link rel=\"canonical\" href=\"{url}\">"
+        f"<script type=\"application/ld+json\">{json.dumps(graph)}</script>"
+        "</head><body>"
+        f"<h1>{street}</h1>{FILLER * padding}"
+        f"{mls_paragraph}{licenses}{FILLER * padding}"
+        "</body></html>"
+    )
+    file_name = "property_" + slug.strip("/").replace("/", "_") + ".html"
+    return file_name, html, mls_number
+
+
+def write_pages(folder, count, start=0, seed=None, padding=1, agents=None):
+    """Write count synthetic pages into folder and return their file names"""
+    os.makedirs(folder, exist_ok=True)
+    names = []
+    for index in range(start, start + count):
+        file_name, html, _ = make_page(index, seed=seed, padding=padding, agents=agents)
+        with open(os.path.join(folder, file_name), "w", encoding="utf-8") as f:
+            f.write(html)
+        names.append(file_name)
+    return names
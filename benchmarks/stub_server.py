@@ -0,0 +1,401 @@
+"""
+Lightweight stand-in for RRR_Server
+Implements the /api endpoints RRR_Admin calls (docs/SERVER_API_REFERENCE.md) on top of sqlite,
+with configurable injected latency and error rates, so database_access and the workflows can be
+exercised and benchmarked without the real server and MySQL.
+
+    python -m benchmarks.stub_server --port 5055 --latency 0.02 --error-rate 0.01
+    LOCAL_DB=http://127.0.0.1:5055/api python app.py
+"""
+
+import argparse
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+SCHEMA = """
+CREATE TABLE listings (mls_number TEXT PRIMARY KEY, lister_id INTEGER, status TEXT, city_state TEXT,
+    listing_type TEXT, details_url TEXT, property_address TEXT, zipcode TEXT, price REAL, beds INTEGER,
+    baths INTEGER, sq_ft INTEGER, created_at TEXT);
+CREATE TABLE contacts (id INTEGER PRIMARY KEY AUTOINCREMENT, contact_type TEXT, email_address TEXT UNIQUE,
+    first_name TEXT, last_name TEXT, license TEXT, phone TEXT, company TEXT, unsubscribed INTEGER DEFAULT 0,
+    created_at TEXT);
+CREATE TABLE colisters (id INTEGER PRIMARY KEY AUTOINCREMENT, mls_number TEXT, contact_id INTEGER);
+CREATE TABLE daily_prices (id INTEGER PRIMARY KEY AUTOINCREMENT, listing_type TEXT, zipcode INTEGER,
+    loan_type TEXT, loan_amount REAL, dp_factor REAL, rate REAL, apr REAL, points_credits REAL, lender TEXT,
+    mi_factor REAL, created_at TEXT);
+CREATE TABLE dscr_daily_prices (id INTEGER PRIMARY KEY AUTOINCREMENT, listing_type TEXT, zipcode INTEGER,
+    lender TEXT, rate REAL, apr REAL, ltv REAL, points_credits REAL, interest_only INTEGER, min_fico INTEGER,
+    created_at TEXT);
+CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, activity_type TEXT, action TEXT, feature TEXT,
+    email_address TEXT, mls_number TEXT, ip_address TEXT, created_at TEXT);
+CREATE TABLE api_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, endpoint TEXT,
+    request_parameters TEXT, status_code INTEGER, ip_address TEXT);
+CREATE TABLE web_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, path TEXT, user_agent TEXT,
+    status_code INTEGER, ip_address TEXT);
+"""
+
+ROW_COLUMNS = {
+    "listing": ["mls_number", "lister_id", "city_state", "listing_type", "details_url", "property_address",
+                "zipcode", "price", "beds", "baths", "sq_ft"],
+    "contact": ["contact_type", "email_address", "first_name", "last_name", "license", "phone", "company"],
+    "daily_prices": ["listing_type", "zipcode", "loan_type", "loan_amount", "dp_factor", "rate", "apr",
+                     "points_credits", "lender", "mi_factor"],
+    "dscr_daily_prices": ["listing_type", "zipcode", "lender", "rate", "apr", "ltv", "points_credits",
+                          "interest_only", "min_fico"],
+}
+
+ARCHIVE_TABLES = {"listings", "contacts", "activities", "api_logs", "web_logs", "daily_prices"}
+
+
+class StubDB:
+    """One shared sqlite connection guarded by a lock (the stand-in favours simplicity over write concurrency)"""
+
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def query(self, sql, args=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, args).fetchall()]
+
+    def execute(self, sql, args=()):
+        with self.lock:
+            cursor = self.conn.execute(sql, args)
+            self.conn.commit()
+            return cursor
+
+    def insert(self, table, columns, values):
+        row = {column: values.get(column) for column in columns}
+        row["created_at"] = datetime.now().isoformat(sep=" ", timespec="seconds")
+        names = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        return self.execute(f"INSERT INTO {table} ({names}) VALUES ({marks})", list(row.values())).lastrowid
+
+
+def seed(db, activities=2000, logs=2000, quoted=100, seed_value=7):
+    """Fill the stand-in with enough rows for the dashboard, log and email paths to do real work"""
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    actions = ["print_flyer_owner", "print_flyer_dscr", "view_listings", "submit_form"]
+    with db.lock:
+        db.conn.executemany(
+            "INSERT INTO activities (activity_type, action, feature, email_address, mls_number, ip_address, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [("ui_click", rng.choice(actions), "standard", f"visitor{rng.randint(1, 300)}@example.com",
+              f"PW{rng.randint(1, 999):07d}", f"10.0.0.{rng.randint(1, 254)}",
+              (now - timedelta(minutes=i)).isoformat(sep=" ", timespec="seconds")) for i in range(activities)])
+        db.conn.executemany(
+            "INSERT INTO api_logs (timestamp, endpoint, request_parameters, status_code, ip_address) VALUES (?, ?, ?, ?, ?)",
+            [((now - timedelta(minutes=i)).isoformat(sep=" ", timespec="seconds"), "/api/listings", "{}", 200,
+              "127.0.0.1") for i in range(logs)])
+        db.conn.executemany(
+            "INSERT INTO web_logs (timestamp, path, user_agent, status_code, ip_address) VALUES (?, ?, ?, ?, ?)",
+            [((now - timedelta(minutes=i)).isoformat(sep=" ", timespec="seconds"), "/", "bench", 200,
+              "127.0.0.1") for i in range(logs)])
+        db.conn.executemany(
+            "INSERT INTO listings (mls_number, status, zipcode, price, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(f"SEED{i:06d}", "quoted", "90620", 800000, now.isoformat(sep=" ", timespec="seconds"))
+             for i in range(quoted)])
+        db.conn.commit()
+
+
+def create_stub_app(latency=0.0, jitter=0.0, error_rate=0.0, db=None, seed_rows=True):
+    """
+    Build the stand-in Flask app. latency/jitter are seconds added to every request and error_rate
+    is the fraction of requests answered with an injected 503; all three live in app.config and can
+    be changed while the server runs.
+    """
+    app = Flask(__name__)
+    app.config.update(STUB_LATENCY=latency, STUB_JITTER=jitter, STUB_ERROR_RATE=error_rate)
+    db = db or StubDB()
+    if seed_rows:
+        seed(db)
+    app.stub_db = db
+
+    @app.before_request
+    def inject_faults():
+        delay = app.config["STUB_LATENCY"] + random.uniform(0, app.config["STUB_JITTER"])
+        if delay:
+            time.sleep(delay)
+        if app.config["STUB_ERROR_RATE"] and random.random() < app.config["STUB_ERROR_RATE"]:
+            return jsonify({"error": "injected failure"}), 503
+
+    def page_args(default_per_page=100):
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = max(int(request.args.get("per_page", default_per_page)), 1)
+        return per_page, (page - 1) * per_page
+
+    def body():
+        return request.get_json(silent=True) or {}
+
+    # ---- activities / logs ----
+
+    @app.get("/api/activities")
+    def get_activities():
+        limit, offset = page_args()
+        sql, args = "SELECT * FROM activities", []
+        if request.args.get("action_like"):
+            sql += " WHERE action LIKE ?"
+            args.append(request.args["action_like"])
+        elif request.args.get("email_address"):
+            sql += " WHERE email_address = ?"
+            args.append(request.args["email_address"])
+        return jsonify(db.query(sql + " ORDER BY id DESC LIMIT ? OFFSET ?", args + [limit, offset]))
+
+    @app.post("/api/activity")
+    @app.post("/api/activities")
+    def add_activity():
+        params = body()
+        activity_id = db.insert("activities", ["activity_type", "action", "feature", "email_address",
+                                               "mls_number", "ip_address"], params)
+        return jsonify({"id": activity_id}), 201
+
+    @app.get("/api/print_activities")
+    def print_activities():
+        return jsonify(db.query("SELECT * FROM activities WHERE action LIKE 'print_flyer%' ORDER BY id DESC LIMIT 500"))
+
+    @app.get("/api/api_log")
+    def api_log():
+        limit, offset = page_args()
+        return jsonify(db.query("SELECT * FROM api_logs ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)))
+
+    @app.get("/api/web_log")
+    def web_log():
+        limit, offset = page_args()
+        return jsonify(db.query("SELECT * FROM web_logs ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)))
+
+    @app.get("/api/api_logs_summary")
+    def api_logs_summary():
+        api_logs = db.query("SELECT COUNT(*) AS n FROM api_logs")[0]["n"]
+        web_logs = db.query("SELECT COUNT(*) AS n FROM web_logs")[0]["n"]
+        return jsonify([{"web_logs": web_logs}, {"api_logs": api_logs}])
+
+    @app.delete("/api/api_log")
+    def purge_api_log():
+        table = "web_logs" if request.args.get("log") == "web_log" else "api_logs"
+        deleted = db.execute(f"DELETE FROM {table} WHERE timestamp < ?", (request.args.get("before", ""),)).rowcount
+        return jsonify({"deleted": deleted})
+
+    # ---- listings / contacts ----
+
+    @app.get("/api/listings")
+    def get_listings():
+        status = request.args.get("status")
+        if status:
+            return jsonify(db.query("SELECT * FROM listings WHERE status = ?", (status,)))
+        return jsonify(db.query("SELECT * FROM listings"))
+
+    @app.get("/api/listings_summary")
+    def listings_summary():
+        return jsonify(db.query("SELECT status, COUNT(*) AS count FROM listings GROUP BY status"))
+
+    @app.get("/api/listing/<mls_number>")
+    def get_listing(mls_number):
+        rows = db.query("SELECT * FROM listings WHERE mls_number = ?", (mls_number,))
+        if not rows:
+            return jsonify({"error": "Listing not found"}), 404
+        return jsonify(rows[0])
+
+    @app.post("/api/listing")
+    def add_listing():
+        params = body()
+        if not params.get("mls_number"):
+            return jsonify({"error": "mls_number required"}), 400
+        try:
+            db.insert("listings", ROW_COLUMNS["listing"] + ["status"], dict(params, status="new"))
+        except sqlite3.IntegrityError:
+            return jsonify({"error": "Listing exists"}), 409
+        return jsonify({"mls_number": params["mls_number"]}), 201
+
+    @app.put("/api/listing")
+    def update_listing():
+        params = body()
+        fields = {key: value for key, value in params.items() if key in ROW_COLUMNS["listing"] + ["status"]}
+        if fields and params.get("mls_number"):
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            db.execute(f"UPDATE listings SET {assignments} WHERE mls_number = ?",
+                       list(fields.values()) + [params["mls_number"]])
+        return jsonify({"mls_number": params.get("mls_number")})
+
+    @app.get("/api/listing_page_views")
+    def listing_page_views():
+        return jsonify([])
+
+    @app.get("/api/contact")
+    def get_contact():
+        rows = db.query("SELECT * FROM contacts WHERE email_address = ?", (request.args.get("email_address"),))
+        if not rows:
+            return jsonify({"error": "Contact not found"}), 404
+        return jsonify(rows[0])
+
+    @app.post("/api/contact")
+    def add_contact():
+        params = body()
+        # agents show up on many listings, so an existing email returns the existing contact
+        rows = db.query("SELECT id FROM contacts WHERE email_address = ?", (params.get("email_address"),))
+        if rows and params.get("email_address") != "N/A":
+            return jsonify({"id": rows[0]["id"]}), 201
+        values = dict(params)
+        if values.get("email_address") == "N/A":
+            values["email_address"] = None
+        contact_id = db.insert("contacts", ROW_COLUMNS["contact"], values)
+        return jsonify({"id": contact_id}), 201
+
+    @app.put("/api/contact")
+    def unsubscribe_contact():
+        db.execute("UPDATE contacts SET unsubscribed = 1 WHERE email_address = ?", (body().get("email_address"),))
+        return jsonify({"email_address": body().get("email_address")})
+
+    @app.get("/api/contacts")
+    def get_contacts():
+        limit, offset = page_args(50)
+        return jsonify(db.query("SELECT * FROM contacts ORDER BY id LIMIT ? OFFSET ?", (limit, offset)))
+
+    @app.get("/api/contacts_summary")
+    def contacts_summary():
+        rows = db.query("SELECT SUM(unsubscribed = 0) AS subscribed, SUM(unsubscribed = 1) AS unsubscribed FROM contacts")
+        return jsonify([{"subscribed": rows[0]["subscribed"] or 0}, {"unsubscribed": rows[0]["unsubscribed"] or 0}])
+
+    @app.post("/api/colister")
+    def add_colister():
+        params = body()
+        colister_id = db.execute("INSERT INTO colisters (mls_number, contact_id) VALUES (?, ?)",
+                                 (params.get("mls_number"), params.get("contact_id"))).lastrowid
+        return jsonify({"id": colister_id}), 201
+
+    # ---- pricing ----
+
+    @app.get("/api/daily_prices")
+    @app.get("/api/daily_price")
+    def get_daily_prices():
+        sql, args = "SELECT * FROM daily_prices WHERE zipcode = ?", [request.args.get("zipcode", type=int)]
+        for column in ("listing_type", "loan_type"):
+            if request.args.get(column):
+                sql += f" AND {column} = ?"
+                args.append(request.args[column])
+        return jsonify(db.query(sql + " ORDER BY id DESC", args))
+
+    @app.post("/api/daily_price")
+    def add_daily_price():
+        price_id = db.insert("daily_prices", ROW_COLUMNS["daily_prices"], body())
+        return jsonify({"id": price_id}), 201
+
+    @app.get("/api/dscr/daily_prices")
+    def get_dscr_prices():
+        sql, args = "SELECT * FROM dscr_daily_prices WHERE zipcode = ?", [request.args.get("zipcode", type=int)]
+        if request.args.get("listing_type"):
+            sql += " AND listing_type = ?"
+            args.append(request.args["listing_type"])
+        return jsonify(db.query(sql + " ORDER BY id DESC", args))
+
+    @app.post("/api/dscr/daily_price")
+    def add_dscr_price():
+        price_id = db.insert("dscr_daily_prices", ROW_COLUMNS["dscr_daily_prices"], body())
+        return jsonify({"id": price_id}), 201
+
+    @app.get("/api/quote_urls")
+    def quote_urls():
+        return jsonify([{"listing_type": "house", "loan_type": "conventional-20",
+                         "url": "https://www.loanfactory.com/rates?stub=1"}])
+
+    @app.get("/api/ami_first")
+    def ami_first():
+        return jsonify({"city_state": request.args.get("city_state"), "ami": 127000})
+
+    @app.get("/api/conforming_limit")
+    def conforming_limit():
+        return jsonify({"zipcode": request.args.get("zipcode"), "one_unit": 806500, "high_balance": 1209750})
+
+    # ---- quotes / emails ----
+
+    def advance(from_status, to_status, limit=None):
+        sql = "SELECT mls_number FROM listings WHERE status = ?" + (" LIMIT ?" if limit else "")
+        rows = db.query(sql, (from_status, limit) if limit else (from_status,))
+        db.execute(f"UPDATE listings SET status = ? WHERE mls_number IN ({', '.join('?' for _ in rows) or 'NULL'})",
+                   [to_status] + [row["mls_number"] for row in rows])
+        return len(rows)
+
+    @app.post("/api/quotes")
+    def add_quotes():
+        return jsonify({"quotes_added": advance(body().get("listing_status") or "new", "quoted")}), 201
+
+    @app.post("/api/dscr/quotes")
+    def add_dscr_quotes():
+        return jsonify({"quotes_added": advance(body().get("listing_status") or "new", "dscr_quoted")}), 201
+
+    @app.post("/api/emails")
+    def add_emails():
+        params = body()
+        from_status, to_status = ("dscr_quoted", "dscr_emailed") if params.get("dscr") else ("quoted", "emailed")
+        limit = int(params.get("max_send_count") or 25)
+        if params.get("debug"):
+            return jsonify({"emails_sent": 0}), 201
+        return jsonify({"emails_sent": advance(from_status, to_status, limit)}), 201
+
+    @app.post("/api/report/run")
+    @app.post("/api/affordability_emails")
+    @app.post("/api/affordability_reports")
+    @app.post("/api/followup_emails")
+    def accepted():
+        return jsonify({"ok": True}), 201
+
+    # ---- archive ----
+
+    @app.post("/api/archive/listings")
+    def archive_listings():
+        return jsonify({"archived": db.query("SELECT COUNT(*) AS n FROM listings WHERE status LIKE '%emailed'")[0]["n"]}), 201
+
+    @app.get("/api/archive/<table>")
+    def get_archive(table):
+        if table not in ARCHIVE_TABLES:
+            return jsonify({"error": f"Unknown table {table}"}), 400
+        limit, offset = page_args(1000)
+        return jsonify(db.query(f"SELECT * FROM {table} LIMIT ? OFFSET ?", (limit, offset)))
+
+    @app.delete("/api/archives")
+    def delete_archives():
+        return jsonify(db.execute("DELETE FROM listings WHERE status LIKE '%emailed'").rowcount)
+
+    return app
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Skip the per-request access log so benchmark output stays readable"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(host="127.0.0.1", port=0, **options):
+    """Run the stand-in on a background thread; returns (server, base_url). port=0 picks a free port."""
+    app = create_stub_app(**options)
+    server = make_server(host, port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/api/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RRR_Server stand-in for local testing and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random 0..jitter seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    app = create_stub_app(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"RRR_Server stand-in on http://{args.host}:{args.port}/api/")
+    make_server(args.host, args.port, app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
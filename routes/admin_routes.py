@@ -1,6 +1,8 @@
 """Admin dashboard and management routes - API-only version"""
 from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, abort, Response
 from services import database_access as api
+from services import database_access_async as api_async
+from services import api_metrics
 from services.my_logger import log
 import os
 import csv
@@ -65,6 +67,26 @@ def web_logs():
                          log_days=log_days_str)
 
 
+@admin_bp.route('/metrics')
+def metrics():
+    """Per-endpoint latency and payload stats for calls made to RRR_Server"""
+    return render_template('admin/metrics.html',
+                         metrics=api_metrics.snapshot(),
+                         buckets=api_metrics.LATENCY_BUCKETS_MS)
+
+
+@admin_bp.route('/metrics.json')
+def metrics_json():
+    return jsonify(api_metrics.snapshot())
+
+
+@admin_bp.route('/metrics/reset', methods=['POST'])
+def reset_metrics():
+    api_metrics.reset()
+    log("API metrics reset")
+    return redirect(url_for('admin.metrics'))
+
+
 @admin_bp.route('/contacts')
 def contacts():
     """View and manage contacts"""
@@ -177,6 +199,21 @@ def dscr_prices():
                          county=county)
 
 
+def _count_flyer_printers():
+    """Unique emails among print_flyer activities, streamed page by page"""
+    unique_emails = set()
+    try:
+        for activity in api.iter_activities(action_like='print_flyer%'):
+            if not isinstance(activity, dict):
+                continue
+            email = activity.get('email_address') or activity.get('email')
+            if email:
+                unique_emails.add(email)
+    except api.APIError as e:
+        log(f'Error loading flyer printers: {e.data}', 'danger')
+    return len(unique_emails)
+
+
 @admin_bp.route('/dashboard')
 def dashboard():
     """Main admin dashboard"""
@@ -184,8 +221,20 @@ def dashboard():
     current_api_mode = session.get('api_mode', 'local')
     log(f"current_api_mode: {current_api_mode}")
 
-    # Get listings summary
-    listings_summary_raw, _ = api.get_listings_summary()
+    # Fetch the independent dashboard datasets concurrently
+    (
+        (listings_summary_raw, _),
+        (contacts_summary, _),
+        (orange_rates, _),
+        flyer_printers_count,
+        (logs_summary, _),
+    ) = api_async.run(
+        api_async.get_listings_summary(),
+        api_async.get_contacts_summary(),
+        api_async.get_daily_prices(zipcode=90620, listing_type='house'),
+        api_async.call(_count_flyer_printers),
+        api_async.get_api_logs_summary(),
+    )
 
     # Convert from [{'count': 72, 'status': 'dscr_emailed'}, ...] to {'dscr_emailed': 72, ...}
     listings_summary = {}
@@ -196,9 +245,6 @@ def dashboard():
             if status and count is not None:
                 listings_summary[status] = count
 
-    # Get contacts summary
-    contacts_summary, _ = api.get_contacts_summary()
-
     # Extract counts from summary [{'subscribed': 164}, {'unsubscribed': 2}]
     subscribed_count = 0
     unsubscribed_count = 0
@@ -209,8 +255,7 @@ def dashboard():
             if 'unsubscribed' in item:
                 unsubscribed_count = item['unsubscribed']
 
-    # Get Orange County house rates (zipcode 90620)
-    orange_rates, _ = api.get_daily_prices(zipcode=90620, listing_type='house')
+    # Orange County house rates (zipcode 90620)
     rates = {}
     if isinstance(orange_rates, list):
         # Map loan types to rate values
@@ -230,23 +275,6 @@ def dashboard():
             if loan_type in loan_type_map:
                 rates[loan_type_map[loan_type]] = rate_value
 
-    # Get flyer printers count
-    all_activities, _ = api.get_activities(page=1, per_page=5000, action_like='print_flyer%')
-
-    # Handle pagination format and count unique emails
-    flyer_printers_count = 0
-    if isinstance(all_activities, list):
-        raw_list = all_activities[0] if len(all_activities) == 2 else all_activities
-        unique_emails = set()
-        for activity in raw_list:
-            email = activity.get('email_address') or activity.get('email')
-            if email:
-                unique_emails.add(email)
-        flyer_printers_count = len(unique_emails)
-
-    # Get logs summary
-    logs_summary, _ = api.get_api_logs_summary()
-
     # Extract counts from summary [{'web_logs': 366}, {'api_logs': 544}]
     api_logs_count = 0
     web_logs_count = 0
@@ -265,7 +293,8 @@ def dashboard():
         'flyer_printers': flyer_printers_count,
         'api_logs': api_logs_count,
         'web_logs': web_logs_count,
-        'api_mode': current_api_mode
+        'api_mode': current_api_mode,
+        'api_status': api.get_api_status()
     }
 
     return render_template('admin/dashboard.html',
@@ -294,142 +323,10 @@ def switch_api():
 
 
 
-@admin_bp.route('/user-print-activity')
-def user_print_activity():
-    """Extract print_flyer activities from api_logs table"""
-    result, status_code = api.add_activities(activity_type="print_flyer")
-
-    if status_code == 200:
-        log('Successfully extracted print activities from API logs', 'success')
-    else:
-        log(f'Error extracting activities: {result}', 'danger')
-
-    """View users who printed flyers from the website"""
-    # Get all activities where contact_id > 2 (exclude system/test contacts)
-    all_activities, status_code = api.get_activities(page=1, per_page=5000, contact_id_gt=2)
-    if status_code != 200:
-        log(f'Error loading activities: {all_activities}', 'danger')
-        activities = []
-    else:
-        # Handle pagination: API returns [rows, count] format
-        raw_list = []
-        if isinstance(all_activities, list):
-            if len(all_activities) == 2 and isinstance(all_activities[1], int) and isinstance(all_activities[0], list):
-                raw_list = all_activities[0]
-            else:
-                raw_list = all_activities
-
-        # All activities are already dicts from the API, just use them directly
-        # Group by email to get unique contacts with their activity counts
-        email_groups = {}
-        for activity in raw_list:
-            if not isinstance(activity, dict):
-                continue
-
-            # Use email_address field (which comes from joined contact table)
-            email = activity.get('email_address') or activity.get('email')
-            if not email:
-                continue
-
-            if email not in email_groups:
-                email_groups[email] = {
-                    'email_address': email,
-                    'first_name': activity.get('first_name', ''),
-                    'last_name': activity.get('last_name', ''),
-                    'company': activity.get('company', ''),
-                    'phone': activity.get('phone', ''),
-                    'print_count': 0,
-                    'last_activity': activity.get('created', ''),
-                }
-
-            email_groups[email]['print_count'] += 1
-
-            # Keep the most recent activity timestamp
-            if activity.get('created', '') > email_groups[email]['last_activity']:
-                email_groups[email]['last_activity'] = activity['created']
-
-        activities = list(email_groups.values())
-        # Sort by last activity (most recent first)
-        activities.sort(key=lambda x: x.get('last_activity', ''), reverse=True)
-
-    return render_template('admin/flyer_printers.html',
-                         activities=activities)
-
-
-@admin_bp.route('/visitor-activity')
-def visitor_activity():
-    # Get all activities where contact_id > 2 (exclude system/test contacts)
-    all_activities, status_code = api.get_activities(page=1, per_page=5000, contact_id_gt=2)
-    if status_code != 200:
-        log(f'Error loading activities: {all_activities}', 'danger')
-        activities = []
-    else:
-        # Handle pagination: API returns [rows, count] format
-        raw_list = []
-        if isinstance(all_activities, list):
-            if len(all_activities) == 2 and isinstance(all_activities[1], int) and isinstance(all_activities[0], list):
-                raw_list = all_activities[0]
-            else:
-                raw_list = all_activities
-
-        # All activities are already dicts from the API, just use them directly
-        # Group by email to get unique contacts with their activity counts
-        email_groups = {}
-        for activity in raw_list:
-            if not isinstance(activity, dict):
-                continue
-
-            # Use email_address field (which comes from joined contact table)
-            email = activity.get('email_address') or activity.get('email')
-            if not email:
-                continue
-
-            if email not in email_groups:
-                email_groups[email] = {
-                    'email_address': email,
-                    'first_name': activity.get('first_name', ''),
-                    'last_name': activity.get('last_name', ''),
-                    'company': activity.get('company', ''),
-                    'phone': activity.get('phone', ''),
-                    'page_count': 0,
-                    'last_activity': activity.get('created', ''),
-                }
-
-            email_groups[email]['page_count'] += 1
-
-            # Keep the most recent activity timestamp
-            if activity.get('created', '') > email_groups[email]['last_activity']:
-                email_groups[email]['last_activity'] = activity['created']
-
-        activities = list(email_groups.values())
-        # Sort by last activity (most recent first)
-        activities.sort(key=lambda x: x.get('last_activity', ''), reverse=True)
-
-    return render_template('admin/user_activity.html',
-                         activities=activities)
-
-
-@admin_bp.route('/export-visitor-activity')
-def export_visitor_activity():
-    """Export user activity to CSV"""
-    # Get all activities where contact_id > 2 (exclude system/test contacts)
-    all_activities, status_code = api.get_activities(page=1, per_page=5000, contact_id_gt=2)
-
-    if status_code != 200:
-        log(f'Error loading activities for export: {all_activities}', 'danger')
-        return redirect(url_for('admin.visitor_activity'))
-
-    # Handle pagination: API returns [rows, count] format
-    raw_list = []
-    if isinstance(all_activities, list):
-        if len(all_activities) == 2 and isinstance(all_activities[1], int) and isinstance(all_activities[0], list):
-            raw_list = all_activities[0]
-        else:
-            raw_list = all_activities
-
-    # Group by email to get unique contacts with their activity counts
+def _group_activities_by_email(activities, count_key):
+    """Group activity rows (streamed) into one row per email with a count and last activity, most recent first"""
     email_groups = {}
-    for activity in raw_list:
+    for activity in activities:
         if not isinstance(activity, dict):
             continue
 
@@ -445,97 +342,84 @@ def export_visitor_activity():
                 'last_name': activity.get('last_name', ''),
                 'company': activity.get('company', ''),
                 'phone': activity.get('phone', ''),
-                'print_count': 0,
+                count_key: 0,
                 'last_activity': activity.get('created', ''),
             }
 
-        email_groups[email]['print_count'] += 1
+        email_groups[email][count_key] += 1
 
         # Keep the most recent activity timestamp
         if activity.get('created', '') > email_groups[email]['last_activity']:
             email_groups[email]['last_activity'] = activity['created']
 
-    activities = list(email_groups.values())
+    grouped = list(email_groups.values())
     # Sort by last activity (most recent first)
-    activities.sort(key=lambda x: x.get('last_activity', ''), reverse=True)
+    grouped.sort(key=lambda x: x.get('last_activity', ''), reverse=True)
+    return grouped
 
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
 
-    # Headers
-    writer.writerow(['First Name', 'Last Name', 'Email', 'Phone', 'Company', 'Print Count', 'Last Activity'])
+@admin_bp.route('/user-print-activity')
+def user_print_activity():
+    """Extract print_flyer activities from api_logs table"""
+    result, status_code = api.add_activities(activity_type="print_flyer")
 
-    # Data
-    for a in activities:
-        writer.writerow([
-            a.get('first_name', ''),
-            a.get('last_name', ''),
-            a.get('email_address', ''),
-            a.get('phone', ''),
-            a.get('company', ''),
-            a.get('print_count', 0),
-            a.get('last_activity', '')
-        ])
+    if status_code == 200:
+        log('Successfully extracted print activities from API logs', 'success')
+    else:
+        log(f'Error extracting activities: {result}', 'danger')
 
-    output.seek(0)
+    """View users who printed flyers from the website"""
+    # Stream all activities where contact_id > 2 (exclude system/test contacts)
+    try:
+        activities = _group_activities_by_email(api.iter_activities(contact_id_gt=2), 'print_count')
+    except api.APIError as e:
+        log(f'Error loading activities: {e.data}', 'danger')
+        activities = []
 
-    return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-disposition": "attachment; filename=flyer_printers.csv"}
-    )
+    return render_template('admin/flyer_printers.html',
+                         activities=activities)
 
-@admin_bp.route('/export-print-activity')
-def export_print_activity():
-    """Export user activity to CSV"""
-    # Get all print flyer activities
-    all_activities, status_code = api.get_activities(page=1, per_page=5000, action_like='print_flyer%')
 
-    if status_code != 200:
-        log(f'Error loading activities for export: {all_activities}', 'danger')
-        return redirect(url_for('admin.user_print_activity'))
+@admin_bp.route('/visitor-activity')
+def visitor_activity():
+    # Stream all activities where contact_id > 2 (exclude system/test contacts)
+    try:
+        activities = _group_activities_by_email(api.iter_activities(contact_id_gt=2), 'page_count')
+    except api.APIError as e:
+        log(f'Error loading activities: {e.data}', 'danger')
+        activities = []
 
-    # Handle pagination: API returns [rows, count] format
-    raw_list = []
-    if isinstance(all_activities, list):
-        if len(all_activities) == 2 and isinstance(all_activities[1], int) and isinstance(all_activities[0], list):
-            raw_list = all_activities[0]
-        else:
-            raw_list = all_activities
+    return render_template('admin/user_activity.html',
+                         activities=activities)
 
-    # Group by email to get unique contacts with their activity counts
-    email_groups = {}
-    for activity in raw_list:
-        if not isinstance(activity, dict):
-            continue
 
-        # Use email_address field (which comes from joined contact table)
-        email = activity.get('email_address') or activity.get('email')
-        if not email:
-            continue
+@admin_bp.route('/export-visitor-activity')
+def export_visitor_activity():
+    """Export user activity to CSV"""
+    # Stream all activities where contact_id > 2 (exclude system/test contacts)
+    try:
+        activities = _group_activities_by_email(api.iter_activities(contact_id_gt=2), 'print_count')
+    except api.APIError as e:
+        log(f'Error loading activities for export: {e.data}', 'danger')
+        return redirect(url_for('admin.visitor_activity'))
 
-        if email not in email_groups:
-            email_groups[email] = {
-                'email_address': email,
-                'first_name': activity.get('first_name', ''),
-                'last_name': activity.get('last_name', ''),
-                'company': activity.get('company', ''),
-                'phone': activity.get('phone', ''),
-                'print_count': 0,
-                'last_activity': activity.get('created', ''),
-            }
+    return _activities_csv(activities)
 
-        email_groups[email]['print_count'] += 1
 
-        # Keep the most recent activity timestamp
-        if activity.get('created', '') > email_groups[email]['last_activity']:
-            email_groups[email]['last_activity'] = activity['created']
+@admin_bp.route('/export-print-activity')
+def export_print_activity():
+    """Export user activity to CSV"""
+    # Stream all print flyer activities
+    try:
+        activities = _group_activities_by_email(api.iter_activities(action_like='print_flyer%'), 'print_count')
+    except api.APIError as e:
+        log(f'Error loading activities for export: {e.data}', 'danger')
+        return redirect(url_for('admin.user_print_activity'))
+
+    return _activities_csv(activities)
 
-    activities = list(email_groups.values())
-    # Sort by last activity (most recent first)
-    activities.sort(key=lambda x: x.get('last_activity', ''), reverse=True)
 
+def _activities_csv(activities):
     # Create CSV in memory
     output = io.StringIO()
     writer = csv.writer(output)
@@ -585,49 +469,37 @@ def listings():
 def _get_flyer_printer_data():
     """Helper to get and filter flyer printer data"""
     # Filter at API level by action pattern (print_flyer_owner, print_flyer_dscr, etc.)
-    all_activities, status_code = api.get_activities(page=1, per_page=5000, action_like='print_flyer%')
+    # and stream the pages; only the print_flyer rows are kept in memory
+    print_activities = []
+    try:
+        for a in api.iter_activities(action_like='print_flyer%'):
+            # Normalize items to dicts
+            if isinstance(a, list) and len(a) >= 12:
+                # Schema mapping from user_activity route
+                a = {
+                    'id': a[0],
+                    'contact_id': a[1],
+                    'email': a[2],
+                    'mls_number': a[3],
+                    'activity_type': a[4],
+                    'feature': a[5],
+                    'action': a[6],
+                    'endpoint': a[7],
+                    'notes': a[8],
+                    'ip_address': a[9],
+                    'user_agent': a[10],
+                    'created': a[11]
+                }
+            if not isinstance(a, dict):
+                continue
 
-    if status_code != 200:
-        log(f"API error: {all_activities}", 'danger')
+            # Filter for print_flyer
+            action = a.get('action')
+            if isinstance(action, str) and action.startswith('print_flyer'):
+                print_activities.append(a)
+    except api.APIError as e:
+        log(f"API error: {e.data}", 'danger')
         return []
-    
-    # 1. Determine list of items (handle pagination variations)
-    raw_list = []
-    if isinstance(all_activities, list):
-        # Check for [rows, count] pattern common in pagination
-        if len(all_activities) == 2 and isinstance(all_activities[1], int) and isinstance(all_activities[0], list):
-             raw_list = all_activities[0]
-        else:
-             raw_list = all_activities
-    
-    # 2. Normalize items to dicts
-    normalized_list = []
-    for a in raw_list:
-        if isinstance(a, dict):
-            normalized_list.append(a)
-        elif isinstance(a, list) and len(a) >= 12:
-             # Schema mapping from user_activity route
-             normalized_list.append({
-                'id': a[0],
-                'contact_id': a[1],
-                'email': a[2],
-                'mls_number': a[3],
-                'activity_type': a[4],
-                'feature': a[5],
-                'action': a[6],
-                'endpoint': a[7],
-                'notes': a[8],
-                'ip_address': a[9],
-                'user_agent': a[10],
-                'created': a[11]
-            })
-
-    # 3. Filter for print_flyer
-    print_activities = []
-    for a in normalized_list:
-        action = a.get('action')
-        if isinstance(action, str) and action.startswith('print_flyer'):
-            print_activities.append(a)
 
     # Sort by created date (most recent first)
     print_activities.sort(key=lambda x: x.get('created', ''), reverse=True)
@@ -718,20 +590,16 @@ def user_activity_detail():
 
     if email or mls_number:
         # Build query parameters
-        params = {'page': 1, 'per_page': 500}
+        params = {}
         if email:
             params['email'] = email
         if mls_number:
             params['mls_number'] = mls_number
 
-        activities_data, status_code = api.get_activities(**params)
-
-        if status_code == 200 and isinstance(activities_data, list):
-            # Handle pagination format
-            if len(activities_data) == 2 and isinstance(activities_data[1], int):
-                activities = activities_data[0]
-            else:
-                activities = activities_data
+        try:
+            activities = list(api.iter_activities(**params))
+        except api.APIError as e:
+            log(f'Error loading activities: {e.data}', 'danger')
 
     return render_template('admin/user_activity_detail.html',
                          activities=activities,
@@ -742,17 +610,13 @@ def user_activity_detail():
 @admin_bp.route('/suspicious-activity')
 def suspicious_activity():
     """Monitor potential hacker activity"""
-    # Get API logs for suspicious patterns
-    api_logs, _ = api.get_api_log(page=1, per_page=1000, since=1)
-    web_logs, _ = api.get_web_log(page=1, per_page=1000, since=1)
-
-    # Analyze for suspicious patterns
+    # Stream the last day of API/web logs and analyze for suspicious patterns
     ip_counts = {}
     suspicious_activities = []
 
     # Process API logs
-    if isinstance(api_logs, list):
-        for log_entry in api_logs:
+    try:
+        for log_entry in api.iter_api_log(since=1):
             ip = log_entry.get('ip_address', 'Unknown')
             ip_counts[ip] = ip_counts.get(ip, 0) + 1
 
@@ -770,14 +634,16 @@ def suspicious_activity():
                     'email': None,
                     'email_address': None
                 })
+    except api.APIError as e:
+        log(f'Error loading API logs: {e.data}', 'danger')
 
     # Process web logs - look for WordPress/hacking attempts
     wordpress_patterns = ['/wp-', 'wp-admin', 'wp-login', 'wp-content', 'wp-includes',
                          'xmlrpc', 'phpmyadmin', '.env', '.git', 'config.php',
                          'admin.php', 'install.php', 'setup.php']
 
-    if isinstance(web_logs, list):
-        for log_entry in web_logs:
+    try:
+        for log_entry in api.iter_web_log(since=1):
             ip = log_entry.get('ip_address', 'Unknown')
             ip_counts[ip] = ip_counts.get(ip, 0) + 1
 
@@ -795,6 +661,8 @@ def suspicious_activity():
                     'email': None,
                     'email_address': None
                 })
+    except api.APIError as e:
+        log(f'Error loading web logs: {e.data}', 'danger')
 
     # Identify high-frequency IPs (potential DDoS or scraping)
     high_frequency_ips = [
@@ -1,7 +1,9 @@
 """Admin workflow routes - run workflows in background like TKinter app"""
-from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
+import os
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, send_from_directory, abort
 from services import database_access as api
 from services import workflow_runner as runner
+from services import task_profiler
 from services.my_logger import log
 
 
@@ -16,6 +18,11 @@ def check_admin():
     api.set_server(current_api_mode)
 
 
+def profiling():
+    """Whether tasks started from this session run under the profiler"""
+    return session.get('profile_tasks', False)
+
+
 @workflow_bp.route('/')
 def index():
     """Workflow management page"""
@@ -48,7 +55,11 @@ def index():
     return render_template('admin/workflows.html',
                          current_api_mode=current_api_mode,
                          stats=workflow_stats,
-                         workflow_status=status)
+                         workflow_status=status,
+                         journal=api.get_journal_counts(),
+                         profiling=profiling(),
+                         profile_runs=task_profiler.list_runs(limit=5),
+                         watcher=runner.get_watcher_status())
 
 
 @workflow_bp.route('/status')
@@ -85,19 +96,69 @@ def run_workflow(workflow_name):
         return redirect(url_for('workflow.index'))
 
     # Start workflow in background
-    runner.run_workflow(workflow, listing_status=listing_status, debug=debug)
+    runner.run_workflow(workflow, profile=profiling(), listing_status=listing_status, debug=debug)
 
     log(f'✅ Started {workflow_name} workflow in background. Use the status panel to monitor progress.')
     return redirect(url_for('workflow.index'))
 
 
+@workflow_bp.route('/watch', methods=['POST'])
+def toggle_watcher():
+    """Start or stop streaming new downloads into the database as they arrive"""
+    if runner.get_watcher_status()['running']:
+        runner.stop_watcher()
+        log('Stopped watching downloads')
+    else:
+        try:
+            runner.start_watcher()
+        except OSError as e:
+            log(f'Error: could not watch downloads: {e}')
+    return redirect(url_for('workflow.index'))
+
+
+@workflow_bp.route('/profiling', methods=['POST'])
+def toggle_profiling():
+    """Switch profiling of workflows and tasks started from this session on or off"""
+    session['profile_tasks'] = not profiling()
+    log(f'Task profiling {"on" if session["profile_tasks"] else "off"} ({task_profiler.PROFILE_MODE})')
+    return redirect(url_for('workflow.index'))
+
+
+@workflow_bp.route('/profiles/<run_id>/<task_file>')
+def view_profile(run_id, task_file):
+    """Top functions of one profiled task"""
+    try:
+        summary = task_profiler.load_summary(run_id, task_file)
+    except (OSError, ValueError):
+        abort(404)
+    sort = request.args.get('sort', 'own_seconds')
+    limit = request.args.get('limit', 30, type=int)
+    return render_template('admin/profile.html',
+                           summary=summary,
+                           task_file=task_file,
+                           sort=sort,
+                           limit=limit,
+                           functions=task_profiler.top_functions(summary, sort, limit))
+
+
+@workflow_bp.route('/profiles/<run_id>/<task_file>/download')
+def download_profile(run_id, task_file):
+    """Raw profile (.prof for cProfile, .folded for sampling)"""
+    try:
+        summary = task_profiler.load_summary(run_id, task_file)
+    except (OSError, ValueError):
+        abort(404)
+    return send_from_directory(os.path.abspath(task_profiler.run_folder(run_id)), summary['raw_file'],
+                               as_attachment=True)
+
+
 # Individual task routes (for manual execution)
 
 @workflow_bp.route('/scrape-homes', methods=['POST'])
 def scrape_homes():
     """Copy HTML files from Downloads to processing folder"""
     try:
-        result = runner.do_scrape()
+        result = runner.run_task(runner.do_scrape, profile=profiling())
         log(f'Scrape homes completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -108,7 +169,7 @@ def scrape_homes():
 def process_listings():
     """Process listing pages from HTML files"""
     try:
-        result = runner.do_process_pages()
+        result = runner.run_task(runner.do_process_pages, profile=profiling())
         log(f'Process listings completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -119,7 +180,7 @@ def process_listings():
 def scrape_pricing():
     """Scrape mortgage pricing from LoanFactory"""
     try:
-        result = runner.do_pricing()
+        result = runner.run_task(runner.do_pricing, profile=profiling())
         log(f'Pricing scrape completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -132,7 +193,7 @@ def generate_quotes():
     listing_status = request.form.get('listing_status', 'new')
 
     try:
-        result = runner.do_quote(listing_status)
+        result = runner.run_task(runner.do_quote, listing_status, profile=profiling())
         log(f'Quote generation completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -145,7 +206,7 @@ def generate_dscr_quotes():
     listing_status = request.form.get('listing_status', 'new')
 
     try:
-        result = runner.do_dscr_quote(listing_status)
+        result = runner.run_task(runner.do_dscr_quote, listing_status, profile=profiling())
         log(f'DSCR quote generation completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -158,7 +219,7 @@ def send_emails():
     debug = request.form.get('debug', 'false') == 'true'
 
     try:
-        result = runner.do_email(debug)
+        result = runner.run_task(runner.do_email, debug, profile=profiling())
         log(f'Email sending completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -171,7 +232,7 @@ def send_dscr_emails():
     debug = request.form.get('debug', 'false') == 'true'
 
     try:
-        result = runner.do_dscr_email(debug)
+        result = runner.run_task(runner.do_dscr_email, debug, profile=profiling())
         log(f'DSCR email sending completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -182,7 +243,7 @@ def send_dscr_emails():
 def dscr_pricing():
     """Add DSCR pricing"""
     try:
-        result = runner.do_dscr_pricing()
+        result = runner.run_task(runner.do_dscr_pricing, profile=profiling())
         log(f'DSCR pricing completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
@@ -192,13 +253,24 @@ def dscr_pricing():
 @workflow_bp.route('/archive', methods=['POST'])
 def archive():
     try:
-        result = runner.do_archive()
+        result = runner.run_task(runner.do_archive, profile=profiling())
         log(f'Archive completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
     return redirect(url_for('workflow.index'))
 
 
+@workflow_bp.route('/replay-journal', methods=['POST'])
+def replay_journal():
+    """Resend writes journaled while RRR_Server was unreachable"""
+    try:
+        result = runner.run_task(runner.do_replay_journal, profile=profiling())
+        log(f'Journal replay completed - {"success" if result else "warning"} - check status for details')
+    except Exception as e:
+        log(f'Error: {str(e)}')
+    return redirect(url_for('workflow.index'))
+
+
 @workflow_bp.route('/cleanup', methods=['POST'])
 def cleanup():
     """Clean up archived records"""
@@ -209,7 +281,7 @@ def cleanup():
         return redirect(url_for('workflow.index'))
 
     try:
-        result = runner.do_clean_up()
+        result = runner.run_task(runner.do_clean_up, profile=profiling())
         log(f'Cleanup completed - {"success" if result else "warning"} - check status for details')
     except Exception as e:
         log(f'Error: {str(e)}')
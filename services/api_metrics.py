@@ -0,0 +1,109 @@
+"""
+In-process metrics for the RRR_Server API client
+database_access calls record() for every request; snapshot() feeds /admin/metrics
+"""
+
+import re
+import threading
+from datetime import datetime
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket catches everything slower)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+_started_at = datetime.now()
+
+
+def endpoint_template(endpoint):
+    """listing/202501952 -> listing/<id>, so per-record calls aggregate under one endpoint"""
+    return re.sub(r"/[^/]*\d[^/]*", "/<id>", endpoint)
+
+
+def _new_entry(method, endpoint):
+    return {
+        "method": method,
+        "endpoint": endpoint,
+        "calls": 0,
+        "errors": 0,
+        "attempts": 0,
+        "statuses": {},
+        "latency_total": 0.0,
+        "latency_max": 0.0,
+        "buckets": [0] * len(LATENCY_BUCKETS_MS),
+        "request_bytes": 0,
+        "response_bytes": 0,
+    }
+
+
+def record(sample):
+    """
+    Request hook: sample has method, endpoint, status, latency (seconds), request_bytes,
+    response_bytes and attempts
+    """
+    method = "DELETE" if sample["method"] == "REMOVE" else sample["method"]
+    key = (method, endpoint_template(sample["endpoint"]))
+    latency_ms = sample["latency"] * 1000
+
+    with _metrics_lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = _metrics[key] = _new_entry(*key)
+        entry["calls"] += 1
+        entry["attempts"] += sample.get("attempts", 1)
+        status = str(sample["status"])
+        entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+        if sample["status"] >= 400:
+            entry["errors"] += 1
+        entry["latency_total"] += sample["latency"]
+        entry["latency_max"] = max(entry["latency_max"], sample["latency"])
+        entry["request_bytes"] += sample.get("request_bytes", 0)
+        entry["response_bytes"] += sample.get("response_bytes", 0)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                entry["buckets"][index] += 1
+                break
+
+
+def _percentile_ms(buckets, calls, fraction):
+    """Upper bound of the bucket holding the given percentile (max bucket reported as None)"""
+    target = calls * fraction
+    running = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, buckets):
+        running += count
+        if running >= target:
+            return None if bound == float("inf") else bound
+    return None
+
+
+def snapshot():
+    """Per-endpoint stats, slowest total time first"""
+    with _metrics_lock:
+        entries = [dict(entry, statuses=dict(entry["statuses"]), buckets=list(entry["buckets"]))
+                   for entry in _metrics.values()]
+
+    for entry in entries:
+        calls = entry["calls"]
+        entry["latency_total"] = round(entry["latency_total"], 4)
+        entry["latency_max_ms"] = round(entry.pop("latency_max") * 1000, 1)
+        entry["latency_avg_ms"] = round(entry["latency_total"] * 1000 / calls, 1) if calls else 0.0
+        entry["p50_ms"] = _percentile_ms(entry["buckets"], calls, 0.50)
+        entry["p95_ms"] = _percentile_ms(entry["buckets"], calls, 0.95)
+        entry["p99_ms"] = _percentile_ms(entry["buckets"], calls, 0.99)
+        entry["buckets"] = {("inf" if bound == float("inf") else str(bound)): count
+                            for bound, count in zip(LATENCY_BUCKETS_MS, entry["buckets"])}
+
+    entries.sort(key=lambda entry: entry["latency_total"], reverse=True)
+    return {
+        "since": _started_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "calls": sum(entry["calls"] for entry in entries),
+        "latency_total": round(sum(entry["latency_total"] for entry in entries), 4),
+        "endpoints": entries,
+    }
+
+
+def reset():
+    global _started_at
+    with _metrics_lock:
+        _metrics.clear()
+        _started_at = datetime.now()
@@ -0,0 +1,218 @@
+"""
+Content-addressed backups of the downloaded pages
+Every file is stored once as a blob named by its sha256 (gzip compressed unless BACKUP_COMPRESS=0);
+a backup is just a small manifest listing each file's name, hash, size and mtime:
+
+    <backup_root>/blobs/ab/abcd...gz
+    <backup_root>/manifests/pages_20250101_120000.json
+
+A file whose size and mtime match the previous manifest reuses its hash without being read, so
+a backup only costs reading and storing new content. restore() rebuilds a folder from a manifest:
+
+    python -m services.backup_store list
+    python -m services.backup_store restore pages_20250101_120000 ~/Downloads/restored
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+BACKUP_ROOT = os.path.expanduser("~/Downloads/backups")
+BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "1") == "1"
+
+_CHUNK = 1024 * 1024
+
+
+def _blob_path(backup_root, content_hash, compressed):
+    return os.path.join(backup_root, "blobs", content_hash[:2], content_hash + (".gz" if compressed else ""))
+
+
+def find_blob(backup_root, content_hash):
+    """Path of a stored blob (compressed or not), or None"""
+    for compressed in (True, False):
+        path = _blob_path(backup_root, content_hash, compressed)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def hash_file(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _write_blob(backup_root, content_hash, file_path, compress):
+    """Store file_path as the blob for content_hash; returns the bytes written"""
+    path = _blob_path(backup_root, content_hash, compress)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a temporary file first so an interrupted backup never leaves a truncated blob
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out, open(file_path, "rb") as src:
+            if compress:
+                with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6, mtime=0) as gz:
+                    shutil.copyfileobj(src, gz, _CHUNK)
+            else:
+                shutil.copyfileobj(src, out, _CHUNK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def list_backups(backup_root=BACKUP_ROOT):
+    """Manifest names, oldest first"""
+    folder = os.path.join(backup_root, "manifests")
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name[:-5] for name in os.listdir(folder) if name.endswith(".json"))
+
+
+def load_manifest(backup_root, name):
+    with open(os.path.join(backup_root, "manifests", os.path.basename(name) + ".json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Backup:
+    """
+    One backup in progress: add() each file, then commit() writes the manifest.
+    Hashes are reused from the latest manifest when a file's size and mtime haven't changed.
+    """
+
+    def __init__(self, source_folder, backup_root=BACKUP_ROOT, compress=None):
+        self.source_folder = source_folder
+        self.backup_root = backup_root
+        self.compress = BACKUP_COMPRESS if compress is None else compress
+        self.name = f"pages_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.files = {}
+        self.stats = {"files": 0, "hashed": 0, "reused": 0, "new_blobs": 0, "bytes": 0, "bytes_stored": 0}
+        self.previous = {}
+        backups = list_backups(backup_root)
+        if backups:
+            try:
+                self.previous = load_manifest(backup_root, backups[-1])["files"]
+            except (OSError, ValueError, KeyError):
+                self.previous = {}
+
+    def add(self, file_path, name=None, stat=None):
+        """Back up one file under name (its path relative to the source folder); returns its hash"""
+        name = (name or os.path.relpath(file_path, self.source_folder)).replace(os.sep, "/")
+        stat = stat or os.stat(file_path)
+        entry = self.previous.get(name)
+        if (entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+                and find_blob(self.backup_root, entry["hash"])):
+            content_hash = entry["hash"]
+            self.stats["reused"] += 1
+        else:
+            content_hash = hash_file(file_path)
+            self.stats["hashed"] += 1
+            if not find_blob(self.backup_root, content_hash):
+                self.stats["bytes_stored"] += _write_blob(self.backup_root, content_hash, file_path, self.compress)
+                self.stats["new_blobs"] += 1
+        self.files[name] = {"hash": content_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        self.stats["files"] += 1
+        self.stats["bytes"] += stat.st_size
+        return content_hash
+
+    def commit(self):
+        """Write the manifest; returns its path"""
+        folder = os.path.join(self.backup_root, "manifests")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, self.name + ".json")
+        suffix = 1
+        while os.path.exists(path):
+            # two backups within the same second
+            suffix += 1
+            path = os.path.join(folder, f"{self.name}_{suffix}.json")
+        self.name = os.path.basename(path)[:-5]
+        manifest = {
+            "name": self.name,
+            "source": os.path.abspath(self.source_folder),
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "stats": self.stats,
+            "files": self.files,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        return path
+
+
+def backup_folder(source_folder, backup_root=BACKUP_ROOT, compress=None):
+    """Back up every file under source_folder; returns (manifest path, stats)"""
+    backup = Backup(source_folder, backup_root, compress)
+    for folder, _, file_names in os.walk(source_folder):
+        for file_name in sorted(file_names):
+            backup.add(os.path.join(folder, file_name))
+    return backup.commit(), backup.stats
+
+
+def restore(name, destination, backup_root=BACKUP_ROOT):
+    """Rebuild the files of backup name under destination (mtimes included); returns the file count"""
+    manifest = load_manifest(backup_root, name)
+    for file_name, entry in manifest["files"].items():
+        blob = find_blob(backup_root, entry["hash"])
+        if blob is None:
+            raise FileNotFoundError(f"Blob {entry['hash']} for {file_name} is missing from {backup_root}")
+        target = os.path.join(destination, *file_name.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        opener = gzip.open if blob.endswith(".gz") else open
+        with opener(blob, "rb") as src, open(target, "wb") as out:
+            shutil.copyfileobj(src, out, _CHUNK)
+        os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    return len(manifest["files"])
+
+
+def prune(keep=30, backup_root=BACKUP_ROOT):
+    """Drop all but the newest keep manifests and delete blobs no remaining manifest uses"""
+    backups = list_backups(backup_root)
+    for name in backups[:-keep] if keep else backups:
+        os.remove(os.path.join(backup_root, "manifests", name + ".json"))
+    used = set()
+    for name in list_backups(backup_root):
+        used.update(entry["hash"] for entry in load_manifest(backup_root, name)["files"].values())
+    removed = 0
+    blobs = os.path.join(backup_root, "blobs")
+    for folder, _, file_names in os.walk(blobs):
+        for file_name in file_names:
+            if file_name.split(".")[0] not in used:
+                os.remove(os.path.join(folder, file_name))
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed page backups")
+    parser.add_argument("--root", default=BACKUP_ROOT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument("name")
+    restore_parser.add_argument("destination")
+    prune_parser = commands.add_parser("prune")
+    prune_parser.add_argument("--keep", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in list_backups(args.root):
+            stats = load_manifest(args.root, name).get("stats", {})
+            print(f"{name}  {stats.get('files', 0)} files, {stats.get('new_blobs', 0)} new")
+    elif args.command == "restore":
+        count = restore(args.name, os.path.expanduser(args.destination), args.root)
+        print(f"✅ Restored {count} files from {args.name} to {args.destination}")
+    else:
+        print(f"🗑️ Removed {prune(args.keep, args.root)} unused blobs")
+
+
+if __name__ == "__main__":
+    main()
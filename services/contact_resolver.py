@@ -0,0 +1,160 @@
+"""
+Contact resolution for listing agents and co-listers
+The same agent shows up on many pages, so contact ids are cached by normalized email per
+server: after the first sighting an agent resolves without a network call. A cold entry is
+looked up with get_contact and only added with add_contact when the server doesn't know it.
+Set CONTACT_CACHE_PATH to keep the cache between runs in a small sqlite file.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from services.database_access import add_contact, get_contact, current_server
+
+CONTACT_CACHE = os.getenv("CONTACT_CACHE", "1") == "1"
+CONTACT_CACHE_PATH = os.getenv("CONTACT_CACHE_PATH", "")
+
+# Placeholders get_agents uses for a missing email; each of those is a distinct contact
+NO_EMAIL = {"", "n/a", "none", "null"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    server TEXT NOT NULL,
+    email TEXT NOT NULL,
+    contact_id INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (server, email)
+);
+"""
+
+_cache = {}
+_cache_lock = threading.Lock()
+_email_locks = {}
+_conn = None
+stats = {"hits": 0, "lookups": 0, "added": 0, "uncached": 0}
+
+
+def normalize_email(email_address):
+    """Lowercased, trimmed email, or None if it's missing or a placeholder"""
+    email = str(email_address or "").strip().lower()
+    return None if email in NO_EMAIL else email
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        folder = os.path.dirname(CONTACT_CACHE_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        _conn = sqlite3.connect(CONTACT_CACHE_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(SCHEMA)
+    return _conn
+
+
+def _load(key):
+    """Cached contact id for (server, email), reading through to the persisted cache"""
+    if key in _cache:
+        return _cache[key]
+    if not CONTACT_CACHE_PATH:
+        return None
+    row = _connection().execute("SELECT contact_id FROM contacts WHERE server = ? AND email = ?", key).fetchone()
+    if row:
+        _cache[key] = row[0]
+        return row[0]
+    return None
+
+
+def _store(key, contact_id):
+    _cache[key] = contact_id
+    if CONTACT_CACHE_PATH:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO contacts (server, email, contact_id, updated_at) VALUES (?, ?, ?, ?)",
+            (*key, contact_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+
+
+def _count(name):
+    with _cache_lock:
+        stats[name] += 1
+
+
+def _checked(contact, status_code):
+    """An add_contact reply passed through only if its body is a contact with an id; anything else is a 500"""
+    if status_code in (200, 201) and not (isinstance(contact, dict) and contact.get("id") is not None):
+        return f"Unexpected contact response ({status_code}): {str(contact)[:200]}", 500
+    return contact, status_code
+
+
+def _found(contact, status_code, email):
+    """
+    The contact id from a get_contact reply, or None. Only a 200 dict with an id (and, if it
+    has one, the same email) counts; a list, an empty body or an error is a miss like a 404.
+    """
+    if status_code != 200 or not isinstance(contact, dict) or contact.get("id") is None:
+        return None
+    if "email_address" in contact and normalize_email(contact["email_address"]) != email:
+        return None
+    return contact["id"]
+
+
+def resolve_contact(agent):
+    """
+    Contact for an agent dict from get_agents, as (data, status_code) like add_contact:
+    200 with {"id": ...} for a known contact, 201 for one just added, or the failing status.
+    A lookup that doesn't give back the contact falls through to add_contact, as the agent
+    would have before the cache; only a failed add_contact fails the agent.
+    """
+    email = normalize_email(agent.get("email_address"))
+    if not CONTACT_CACHE or email is None:
+        _count("uncached")
+        return _checked(*add_contact(agent))
+
+    key = (current_server(), email)
+    with _cache_lock:
+        contact_id = _load(key)
+        if contact_id is not None:
+            stats["hits"] += 1
+            return {"id": contact_id}, 200
+        # one lookup per email even when several ingest threads meet the same agent at once
+        email_lock = _email_locks.setdefault(key, threading.Lock())
+
+    with email_lock:
+        with _cache_lock:
+            contact_id = _load(key)
+        if contact_id is not None:
+            _count("hits")
+            return {"id": contact_id}, 200
+
+        _count("lookups")
+        contact_id = _found(*get_contact(agent.get("email_address")), email)
+        if contact_id is not None:
+            with _cache_lock:
+                _store(key, contact_id)
+            return {"id": contact_id}, 200
+
+        contact, status_code = _checked(*add_contact(agent))
+        if status_code == 201:
+            _count("added")
+            with _cache_lock:
+                _store(key, contact["id"])
+        return contact, status_code
+
+
+def reset_stats():
+    with _cache_lock:
+        for name in stats:
+            stats[name] = 0
+
+
+def clear():
+    """Forget every cached contact (e.g. after the server database was restored)"""
+    with _cache_lock:
+        _cache.clear()
+        _email_locks.clear()
+        if CONTACT_CACHE_PATH:
+            _connection().execute("DELETE FROM contacts")
+            _connection().commit()
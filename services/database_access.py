@@ -1,9 +1,20 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 import os
+import contextvars
+import copy
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from datetime import datetime
 import platform
 from dotenv import load_dotenv
+from services import api_metrics, write_journal
 # from services.my_logger import log
 
 
@@ -27,33 +38,654 @@ headers = {"X-API-Key": API_KEY}
 LOCAL_DB = os.getenv("LOCAL_DB")
 REMOTE_DB = os.getenv("REMOTE_DB")
 
-# Initialize SERVER_DB with local as default
+# Process-wide default server (local if configured). The server actually used is bound per
+# context by set_server(), so concurrent requests and the workflow thread can't redirect each other.
 SERVER_DB = LOCAL_DB if LOCAL_DB else REMOTE_DB
+_server_db = contextvars.ContextVar("server_db", default=None)
+
+# Connection pool / timeout settings for the keep-alive sessions
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "300"))
+
+# One pooled session per server URL, shared by Flask request threads and the workflow thread
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Read-through cache for reference data that changes at most once a day (TTL seconds per endpoint)
+CACHE_TTLS = {
+    "ami_first": 86400,
+    "conforming_limit": 86400,
+    "quote_urls": 3600,
+    "daily_prices": 900,
+    "dscr/daily_prices": 900,
+}
+CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+# (server, endpoint) -> write generation, bumped by invalidate_cache. A GET that started in an
+# older generation may hold pre-write data, so it is neither cached nor shared with later callers.
+_generations = {}
+
+# Retry with jittered exponential backoff, and a per-server circuit breaker
+API_RETRY_ATTEMPTS = int(os.getenv("API_RETRY_ATTEMPTS", "3"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+API_RETRY_MAX_BACKOFF = float(os.getenv("API_RETRY_MAX_BACKOFF", "8"))
+API_BREAKER_THRESHOLD = int(os.getenv("API_BREAKER_THRESHOLD", "5"))
+API_BREAKER_COOLDOWN = float(os.getenv("API_BREAKER_COOLDOWN", "30"))
+
+IDEMPOTENT_METHODS = {"GET", "PUT", "REMOVE"}
+RETRY_STATUS_CODES = {502, 503, 504}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_retry_stats = {"retries": 0, "fast_failures": 0}
+
+# Concurrent identical GETs (same server, endpoint and params) share one in-flight request
+API_SINGLEFLIGHT = os.getenv("API_SINGLEFLIGHT", "1") == "1"
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_singleflight_stats = {"requests": 0, "shared": 0}
+
+# Writes that can't reach the server are journaled locally and replayed by replay_journal()
+API_JOURNAL = os.getenv("API_JOURNAL", "1") == "1"
+
+_replay_handlers = {}
+
+# Request hooks get one sample dict per call: method, endpoint, server, status, latency (s),
+# request_bytes, response_bytes, attempts. Set API_LOG_REQUESTS=1 to also print each call.
+API_LOG_REQUESTS = os.getenv("API_LOG_REQUESTS", "0") == "1"
+_request_hooks = [api_metrics.record]
 
 
 def set_server(use_server="local"):
-    global SERVER_DB
+    """Bind the API server for the current context (Flask request, workflow thread or script)"""
     if use_server == "local":
-        SERVER_DB = LOCAL_DB
+        _server_db.set(LOCAL_DB)
     else:
-        SERVER_DB = REMOTE_DB
-    # log(f"Using SERVER_DB: {SERVER_DB}")
+        _server_db.set(REMOTE_DB)
+    # log(f"Using SERVER_DB: {current_server()}")
+
+
+def clear_server():
+    """Drop the context binding so the next lookup falls back to SERVER_DB"""
+    _server_db.set(None)
+
+
+def current_server():
+    return _server_db.get() or SERVER_DB
+
+
+def _get_session(server):
+    """Return the pooled keep-alive session for a server, creating it on first use"""
+    session = _sessions.get(server)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(server)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[server] = session
+    return session
+
+
+def close_sessions():
+    """Close all pooled sessions (connections are re-opened on the next request)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _breaker_allow(server):
+    """Return True if a call may go to the server; after the cooldown a single probe is let through"""
+    with _breakers_lock:
+        breaker = _breakers.setdefault(server, {"state": "closed", "failures": 0, "opened_at": None})
+        if breaker["state"] == "closed":
+            return True
+        # a probe that never reported back is replaced after another cooldown
+        if time.monotonic() - breaker["opened_at"] >= API_BREAKER_COOLDOWN:
+            breaker.update(state="half_open", opened_at=time.monotonic())
+            return True
+        # open and still cooling down, or a half-open probe is already in flight
+        _retry_stats["fast_failures"] += 1
+        return False
+
+
+def _breaker_record(server, success):
+    with _breakers_lock:
+        breaker = _breakers.setdefault(server, {"state": "closed", "failures": 0, "opened_at": None})
+        if success:
+            breaker.update(state="closed", failures=0, opened_at=None)
+            return
+        breaker["failures"] += 1
+        if breaker["state"] == "half_open" or breaker["failures"] >= API_BREAKER_THRESHOLD:
+            if breaker["state"] != "open":
+                print(f"API circuit opened for {server} after {breaker['failures']} failures")
+            breaker.update(state="open", opened_at=time.monotonic())
+
+
+def _never_sent(exc):
+    """True when the request failed before reaching the server, so resending is safe for any method"""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _backoff(attempt):
+    with _breakers_lock:
+        _retry_stats["retries"] += 1
+    # "full jitter": sleep a random amount up to the exponential cap
+    time.sleep(random.uniform(0, min(API_RETRY_MAX_BACKOFF, API_RETRY_BACKOFF * 2 ** (attempt - 1))))
+
+
+def get_api_status():
+    """Circuit breaker, retry, cache and request-coalescing state for the dashboard"""
+    now = time.monotonic()
+    with _breakers_lock:
+        breakers = {}
+        for server, breaker in _breakers.items():
+            retry_in = 0
+            if breaker["state"] == "open":
+                retry_in = max(0, int(API_BREAKER_COOLDOWN - (now - breaker["opened_at"])))
+            breakers[server] = {"state": breaker["state"], "failures": breaker["failures"], "retry_in": retry_in}
+        retry_stats = dict(_retry_stats)
+
+    server = current_server()
+    current = breakers.get(server, {"state": "closed", "failures": 0, "retry_in": 0})
+    return {
+        "server": server,
+        "state": current["state"],
+        "failures": current["failures"],
+        "retry_in": current["retry_in"],
+        "breakers": breakers,
+        "retries": retry_stats["retries"],
+        "fast_failures": retry_stats["fast_failures"],
+        "cache": get_cache_stats(),
+        "shared_gets": _singleflight_stats["shared"],
+    }
+
+
+def add_request_hook(hook):
+    if hook not in _request_hooks:
+        _request_hooks.append(hook)
+
+
+def remove_request_hook(hook):
+    if hook in _request_hooks:
+        _request_hooks.remove(hook)
+
 
+def _print_request(sample):
+    print(f"API {sample['method']} {sample['endpoint']} -> {sample['status']} "
+          f"in {sample['latency'] * 1000:.0f}ms ({sample['attempts']} attempt(s))")
 
-def _request(method, endpoint, **kwargs):
-    """Helper to make safe API requests with error handling"""
+
+if API_LOG_REQUESTS:
+    add_request_hook(_print_request)
+
+
+def _run_hooks(sample):
+    for hook in list(_request_hooks):
+        try:
+            hook(sample)
+        except Exception as e:
+            print(f"API request hook {hook} failed: {e}")
+
+
+class _Flight:
+    """One in-flight GET that later identical GETs wait on instead of sending their own"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+
+
+def _request(method, endpoint, idempotent=None, delivery=None, **kwargs):
+    """
+    Helper to make safe API requests with error handling.
+    Idempotent calls (GET/PUT/DELETE, or idempotent=True) are retried on connection errors (not
+    read timeouts) and 502/503/504; other POSTs are only retried when the request never reached
+    the server. The circuit breaker counts each call once, after its retries.
+    delivery: optional dict; delivery["reached"] is set to whether any attempt may have reached
+    the server (a response came back, or the connection failed after the request went out).
+    """
+    if method == "GET" and API_SINGLEFLIGHT:
+        return _shared_get(endpoint, idempotent, **kwargs)
+    return _timed_request(method, endpoint, idempotent, delivery, **kwargs)
+
+
+def _shared_get(endpoint, idempotent, **kwargs):
+    """Coalesce identical concurrent GETs: the first caller sends, the rest get a copy of its result"""
+    # callers that arrive after a write start a new flight instead of joining one that began before it
+    key = _cache_key(endpoint, kwargs.get("params")) + (_generation(endpoint),)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        if flight is None:
+            flight = _inflight[key] = _Flight()
+            leader = True
+            _singleflight_stats["requests"] += 1
+        else:
+            flight.waiters += 1
+            leader = False
+            _singleflight_stats["shared"] += 1
+
+    if not leader:
+        flight.done.wait()
+        data, status_code = flight.result
+        return copy.deepcopy(data), status_code
+
+    result = ("Connection Error: request failed", 503)
     try:
-        url = f"{SERVER_DB}{endpoint}"
-        print(f"method: {method} endpoint: {endpoint} kwargs: {kwargs}")
-        # using DELETE casues the IDE editor to get weird
-        if method == "REMOVE":
-            response = requests.delete(url=url, headers=headers, **kwargs)
+        result = _timed_request("GET", endpoint, idempotent, **kwargs)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+            waiters = flight.waiters
+        # no new waiters can join once the flight is unregistered; copy only if someone is waiting,
+        # and before the leader's caller gets a chance to modify the rows
+        flight.result = (copy.deepcopy(result[0]), result[1]) if waiters else result
+        flight.done.set()
+
+
+def _timed_request(method, endpoint, idempotent=None, delivery=None, **kwargs):
+    started = time.perf_counter()
+    sample = {"method": method, "endpoint": endpoint, "server": current_server(),
+              "request_bytes": 0, "response_bytes": 0, "attempts": 0}
+    reached = [False]
+    data, status_code = _send(method, endpoint, idempotent, sample, reached, **kwargs)
+    if delivery is not None:
+        delivery["reached"] = reached[0]
+    sample["status"] = status_code
+    sample["latency"] = time.perf_counter() - started
+    _run_hooks(sample)
+    return data, status_code
+
+
+def _send(method, endpoint, idempotent, sample, reached, **kwargs):
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+
+    server = sample["server"]
+    url = f"{server}{endpoint}"
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    session = _get_session(server)
+
+    # the breaker sees one result per call, not one per attempt, so a call that is retried
+    # three times can't open it on its own
+    if not _breaker_allow(server):
+        return f"Connection Error: {server} is unavailable (circuit open)", 503
+
+    for attempt in range(1, API_RETRY_ATTEMPTS + 1):
+        sample["attempts"] = attempt
+        try:
+            # using DELETE casues the IDE editor to get weird
+            if method == "REMOVE":
+                response = session.delete(url=url, **kwargs)
+            else:
+                response = session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            reached[0] = reached[0] or not _never_sent(e)
+            print(f"API Connection Error accessing {endpoint} (attempt {attempt}): {e}")
+            # a read timeout already waited the full API_READ_TIMEOUT on a hung server; retrying
+            # it would hold the caller for several of those
+            retryable = _never_sent(e) or (idempotent and not isinstance(e, requests.exceptions.ReadTimeout))
+            if attempt < API_RETRY_ATTEMPTS and retryable:
+                _backoff(attempt)
+                continue
+            _breaker_record(server, False)
+            return f"Connection Error: {str(e)}", 503
+
+        reached[0] = True
+        body = response.request.body
+        sample["request_bytes"] += len(body) if body else 0
+        sample["response_bytes"] += len(response.content)
+
+        if response.status_code in RETRY_STATUS_CODES:
+            if idempotent and attempt < API_RETRY_ATTEMPTS:
+                _backoff(attempt)
+                continue
+            _breaker_record(server, False)
         else:
-            response = requests.request(method, url, headers=headers, **kwargs)
+            _breaker_record(server, True)
         return return_response(endpoint, response)
-    except requests.exceptions.RequestException as e:
-        print(f"API Connection Error accessing {endpoint}: {e}")
-        return f"Connection Error: {str(e)}", 503
+
+
+def _cache_key(endpoint, params):
+    # requests drops None-valued params, so they don't take part in the key either
+    items = tuple(sorted((key, str(value)) for key, value in (params or {}).items() if value is not None))
+    return current_server(), endpoint, items
+
+
+def _generation(endpoint):
+    with _cache_lock:
+        return _generations.get((current_server(), endpoint), 0)
+
+
+def _cached_get(endpoint, params=None):
+    """GET through the LRU cache; only successful responses are stored"""
+    key = _cache_key(endpoint, params)
+    now = time.monotonic()
+    with _cache_lock:
+        generation = _generations.get(key[:2], 0)
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            # callers decorate the returned rows in place, so never hand out the cached objects
+            return copy.deepcopy(entry[1]), 200
+        if entry is not None:
+            del _cache[key]
+        _cache_stats["misses"] += 1
+
+    data, status_code = _request("GET", endpoint, params=params)
+    if status_code == 200:
+        with _cache_lock:
+            if _generations.get(key[:2], 0) != generation:
+                # a write landed while this GET was out; its result may predate the write
+                return data, status_code
+            _cache[key] = (now + CACHE_TTLS[endpoint], copy.deepcopy(data))
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+                _cache_stats["evictions"] += 1
+    return data, status_code
+
+
+def invalidate_cache(endpoint, **params):
+    """
+    Drop cached entries for an endpoint on the current server that could contain the given row.
+    An entry matches when each of its params is either absent from `params` or equal to it,
+    so unfiltered entries (e.g. all zipcodes) are always dropped.
+    """
+    written = {key: str(value) for key, value in params.items() if value is not None}
+    current = current_server()
+    with _cache_lock:
+        _generations[(current, endpoint)] = _generations.get((current, endpoint), 0) + 1
+        for key in list(_cache):
+            server, cached_endpoint, items = key
+            if server != current or cached_endpoint != endpoint:
+                continue
+            if all(written.get(name, value) == value for name, value in items):
+                del _cache[key]
+                _cache_stats["invalidations"] += 1
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_cache_stats():
+    """Hit/miss counters for the reference-data cache"""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["size"] = len(_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+def _journaled_post(endpoint, params):
+    """
+    POST a write that doesn't depend on any other call's result. If no attempt reached the
+    server, the write is journaled and reported as accepted (202) instead of being lost.
+    A POST that may have reached it (read timeout, 5xx) isn't journaled: the server documents
+    no idempotency support, so replaying it could insert the row twice.
+    """
+    key = str(uuid.uuid4())
+    delivery = {}
+    data, status_code = _request("POST", endpoint, delivery=delivery, json=params, headers={"Idempotency-Key": key})
+    if API_JOURNAL and status_code in RETRY_STATUS_CODES and not delivery["reached"]:
+        entry = {"method": "POST", "endpoint": endpoint, "json": params}
+        return _journal("request", entry, key, data)
+    return data, status_code
+
+
+def _journal(kind, payload, key, reason):
+    entry_id = write_journal.append(current_server(), kind, payload, key)
+    print(f"API journaled {kind} #{entry_id} for replay: {str(reason).strip()}")
+    return {"journaled": True, "id": entry_id}, 202
+
+
+def journal_write(kind, payload):
+    """Journal a multi-call write (replayed by the handler registered for `kind`); 202 once journaled"""
+    if not API_JOURNAL:
+        return "Write journal disabled", 503
+    return _journal(kind, payload, str(uuid.uuid4()), "server unreachable")
+
+
+def register_replay(kind, handler):
+    """handler(payload) -> (data, status_code); 502/503/504 leaves the entry pending"""
+    _replay_handlers[kind] = handler
+
+
+def get_journal_counts():
+    return write_journal.counts(current_server())
+
+
+def replay_journal(progress=None):
+    """
+    Resend the journaled writes for the current server, oldest first. Stops at the first one that
+    still can't reach the server so order is kept; writes the server rejects, and resends that
+    reached it but failed (they may have been applied), are marked failed.
+    progress(done, total) is called after each entry.
+    """
+    entries = write_journal.pending(current_server())
+    summary = {"replayed": 0, "failed": 0, "pending": len(entries)}
+    for index, entry in enumerate(entries, start=1):
+        payload = entry["payload"]
+        delivery = {"reached": False}
+        if entry["kind"] == "request":
+            data, status_code = _request(payload["method"], payload["endpoint"], delivery=delivery,
+                                         json=payload["json"], headers={"Idempotency-Key": entry["idempotency_key"]})
+        elif entry["kind"] in _replay_handlers:
+            data, status_code = _replay_handlers[entry["kind"]](payload)
+        else:
+            data, status_code = f"No replay handler for {entry['kind']}", 400
+
+        if status_code in RETRY_STATUS_CODES and delivery["reached"]:
+            # the resend may have been applied; sending it yet again could duplicate the row
+            write_journal.mark_failed(entry["id"], f"{status_code} after reaching the server, outcome unknown: {data}")
+            summary["failed"] += 1
+        elif status_code in RETRY_STATUS_CODES:
+            write_journal.mark_retry(entry["id"], str(data))
+            break
+        elif status_code < 400:
+            write_journal.mark_done(entry["id"])
+            summary["replayed"] += 1
+        else:
+            write_journal.mark_failed(entry["id"], f"{status_code}: {data}")
+            summary["failed"] += 1
+        summary["pending"] -= 1
+        if progress:
+            progress(index, len(entries))
+    return summary
+
+
+class BatchWriter:
+    """
+    Collects rows for a single-row write function (e.g. add_dscr_price) and sends them in bounded
+    chunks instead of one blocking POST per row. A chunk is flushed when `batch_size` rows are
+    queued or the oldest queued row is `max_wait` seconds old; its rows are posted concurrently.
+
+    Every row gets a result (row, data, status_code), available from flush()/close() and
+    .results in add() order; .failures lists the rows that were not written. A row whose
+    write_func raised gets (row, error text, 500).
+    """
+
+    def __init__(self, write_func, batch_size=25, max_wait=5.0, max_workers=4):
+        self.write_func = write_func
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.results = []
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-writer")
+        self._closed = threading.Event()
+        # the timer thread runs in a copy of our context so it posts to the same server
+        context = contextvars.copy_context()
+        self._timer = threading.Thread(target=context.run, args=(self._flush_when_stale,), daemon=True)
+        self._timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def failures(self):
+        return [result for result in self.results if result[2] not in (200, 201, 202)]
+
+    def add(self, row):
+        with self._lock:
+            self._pending.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Send everything queued so far and return the results of this flush"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending, self._oldest = self._pending, [], None
+            if not rows:
+                return []
+
+            futures = [self._executor.submit(contextvars.copy_context().run, self.write_func, row) for row in rows]
+            results = [self._result(row, future) for row, future in zip(rows, futures)]
+
+            self.results.extend(results)
+            return results
+
+    @staticmethod
+    def _result(row, future):
+        try:
+            return (row, *future.result())
+        except Exception as e:
+            print(f"BatchWriter write failed: {e}")
+            return row, str(e), 500
+
+    def close(self):
+        """Stop the timer, flush what is left and return all results"""
+        self._closed.set()
+        self._timer.join()
+        self.flush()
+        self._executor.shutdown()
+        return self.results
+
+    def _flush_when_stale(self):
+        while not self._closed.wait(min(self.max_wait, 1.0)):
+            with self._lock:
+                stale = self._oldest is not None and time.monotonic() - self._oldest >= self.max_wait
+            if stale:
+                try:
+                    self.flush()
+                except Exception as e:
+                    # keep the timer alive for the rows added after this
+                    print(f"BatchWriter timed flush failed: {e}")
+
+
+def daily_price_writer(**options):
+    """BatchWriter for add_daily_price rows (the kwargs of add_daily_price as a dict)"""
+    return BatchWriter(lambda row: add_daily_price(**row), **options)
+
+
+def dscr_price_writer(**options):
+    """BatchWriter for add_dscr_price rows"""
+    return BatchWriter(add_dscr_price, **options)
+
+
+class APIError(Exception):
+    """Raised by the iter_* helpers when a page can't be fetched"""
+
+    def __init__(self, data, status_code):
+        super().__init__(f"HTTP {status_code}: {data}")
+        self.data = data
+        self.status_code = status_code
+
+
+def _page_rows(data):
+    """Normalize a paged response: [rows, count] or a plain list of rows -> (rows, count or None)"""
+    if isinstance(data, list) and len(data) == 2 and isinstance(data[0], list) and isinstance(data[1], int):
+        return data[0], data[1]
+    if isinstance(data, list):
+        return data, None
+    return [], None
+
+
+def _iter_pages(fetch_page, per_page):
+    """
+    Yield rows from a paged endpoint one page at a time. While a page is being consumed the
+    next one is already being fetched in the background. Stops at an empty page, once the
+    reported total has been seen, at a page longer than per_page (the endpoint ignored paging
+    and sent everything) or at a page that starts with the previous page's first row (the
+    endpoint ignored the page number); a short page alone doesn't end it, since the server
+    may cap per_page below what was asked for. Raises APIError if a page fails.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch")
+    try:
+        page = 1
+        seen = 0
+        previous_first = None
+        future = executor.submit(contextvars.copy_context().run, fetch_page, page)
+        while True:
+            data, status_code = future.result()
+            if status_code != 200:
+                raise APIError(data, status_code)
+
+            rows, total = _page_rows(data)
+            if not rows or (page > 1 and rows[0] == previous_first):
+                return
+            previous_first = rows[0]
+            seen += len(rows)
+            last_page = len(rows) > per_page or (total is not None and seen >= total)
+            if not last_page:
+                page += 1
+                future = executor.submit(contextvars.copy_context().run, fetch_page, page)
+
+            yield from rows
+            if last_page:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_activities(per_page=500, **kwargs):
+    return _iter_pages(lambda page: get_activities(page=page, per_page=per_page, **kwargs), per_page)
+
+
+def iter_api_log(per_page=500, **kwargs):
+    return _iter_pages(lambda page: get_api_log(page=page, per_page=per_page, **kwargs), per_page)
+
+
+def iter_web_log(per_page=500, **kwargs):
+    return _iter_pages(lambda page: get_web_log(page=page, per_page=per_page, **kwargs), per_page)
+
+
+def iter_listings(per_page=1000, **kwargs):
+    return _iter_pages(lambda page: get_listings(page=page, per_page=per_page, **kwargs), per_page)
+
+
+def iter_archive(table=None, per_page=1000, **kwargs):
+    return _iter_pages(lambda page: get_archive(table=table, page=page, per_page=per_page, **kwargs), per_page)
 
 
 def add_activity(**kwargs):
@@ -102,12 +734,16 @@ def add_followup_emails(**kwargs):
 
 def add_daily_price(**kwargs):
     params = {key: to_json_serializable(value) for key, value in kwargs.items()}
-    return _request("POST", "daily_price", json=params)
+    result = _journaled_post("daily_price", params)
+    invalidate_cache("daily_prices", zipcode=params.get("zipcode"), listing_type=params.get("listing_type"))
+    return result
 
 
 def add_dscr_price(params_dict):
     params = {key: to_json_serializable(value) for key, value in params_dict.items()}
-    return _request("POST", "dscr/daily_price", json=params)
+    result = _journaled_post("dscr/daily_price", params)
+    invalidate_cache("dscr/daily_prices", zipcode=params.get("zipcode"), listing_type=params.get("listing_type"))
+    return result
 
 
 def add_dscr_quotes(listing_status=None):
@@ -140,7 +776,8 @@ def add_quote_dict(params_dict=None):
 
 
 def archive_listings():
-    return _request("POST", f"archive/listings")
+    # only flags rows as archived, so it is safe to resend
+    return _request("POST", f"archive/listings", idempotent=True)
 
 
 def delete_archives():
@@ -148,7 +785,7 @@ def delete_archives():
 
 
 def get_ami_first(city_state=None):
-    return _request("GET", "ami_first", params={"city_state": city_state})
+    return _cached_get("ami_first", params={"city_state": city_state})
 
 
 def get_activities(page=1, per_page=100, **kwargs):
@@ -185,7 +822,7 @@ def get_conforming_limit(zipcode=None, normalized_type=None):
     params = {
         "zipcode": zipcode,
         "normalized_type": normalized_type}
-    return _request("GET", "conforming_limit", params=params)
+    return _cached_get("conforming_limit", params=params)
 
 
 def get_contact(email_address=None):
@@ -213,14 +850,14 @@ def get_daily_prices(zipcode=None, listing_type=None):
     params = {
         "zipcode": zipcode,
         "listing_type": listing_type}
-    return _request("GET", "daily_prices", params=params)
+    return _cached_get("daily_prices", params=params)
 
 
 def get_dscr_prices(zipcode=None, listing_type=None):
     params = {
         "zipcode": zipcode,
         "listing_type": listing_type}
-    return _request("GET", "dscr/daily_prices", params=params)
+    return _cached_get("dscr/daily_prices", params=params)
 
 
 def get_print_activities():
@@ -258,7 +895,7 @@ def get_quote_urls(zipcode=None, listing_type=None):
         "zipcode": zipcode,
         "listing_type": listing_type
     }
-    return _request("GET", "quote_urls", params=params)
+    return _cached_get("quote_urls", params=params)
 
 
 def get_web_log(**kwargs):
@@ -0,0 +1,206 @@
+"""
+Asyncio twin of services/database_access.py
+Every API function is available as an awaitable with the same (data, status_code) contract.
+Calls run on worker threads through the pooled sync client, so they share its sessions.
+"""
+
+import asyncio
+import os
+from services import database_access as api
+
+
+# Default cap on concurrent in-flight calls for gather_limited()
+API_ASYNC_CONCURRENCY = int(os.getenv("API_ASYNC_CONCURRENCY", "8"))
+
+
+async def _call(func, *args, **kwargs):
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def gather_limited(*aws, limit=None):
+    """Await coroutines concurrently with at most `limit` in flight; results keep input order"""
+    semaphore = asyncio.Semaphore(limit or API_ASYNC_CONCURRENCY)
+
+    async def _bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_bounded(aw) for aw in aws))
+
+
+async def call(func, *args, **kwargs):
+    """Run any blocking helper (e.g. one that streams an iter_* generator) on a worker thread"""
+    return await _call(func, *args, **kwargs)
+
+
+def run(*aws, limit=None):
+    """Run coroutines to completion from sync code (e.g. a Flask route) and return their results"""
+    return asyncio.run(gather_limited(*aws, limit=limit))
+
+
+async def add_activity(**kwargs):
+    return await _call(api.add_activity, **kwargs)
+
+
+async def add_activities(**kwargs):
+    return await _call(api.add_activities, **kwargs)
+
+
+async def add_contact(lister):
+    return await _call(api.add_contact, lister)
+
+
+async def add_colister(mls_number, colister_id):
+    return await _call(api.add_colister, mls_number, colister_id)
+
+
+async def add_affordability_emails(**kwargs):
+    return await _call(api.add_affordability_emails, **kwargs)
+
+
+async def add_affordability_reports(**kwargs):
+    return await _call(api.add_affordability_reports, **kwargs)
+
+
+async def add_followup_emails(**kwargs):
+    return await _call(api.add_followup_emails, **kwargs)
+
+
+async def add_daily_price(**kwargs):
+    return await _call(api.add_daily_price, **kwargs)
+
+
+async def add_dscr_price(params_dict):
+    return await _call(api.add_dscr_price, params_dict)
+
+
+async def add_dscr_quotes(listing_status=None):
+    return await _call(api.add_dscr_quotes, listing_status=listing_status)
+
+
+async def add_emails(**kwargs):
+    return await _call(api.add_emails, **kwargs)
+
+
+async def add_listing_dict(params_dict=None):
+    return await _call(api.add_listing_dict, params_dict)
+
+
+async def add_quote(**kwargs):
+    return await _call(api.add_quote, **kwargs)
+
+
+async def add_quotes(**kwargs):
+    return await _call(api.add_quotes, **kwargs)
+
+
+async def add_quote_dict(params_dict=None):
+    return await _call(api.add_quote_dict, params_dict)
+
+
+async def archive_listings():
+    return await _call(api.archive_listings)
+
+
+async def delete_archives():
+    return await _call(api.delete_archives)
+
+
+async def get_ami_first(city_state=None):
+    return await _call(api.get_ami_first, city_state=city_state)
+
+
+async def get_activities(page=1, per_page=100, **kwargs):
+    return await _call(api.get_activities, page=page, per_page=per_page, **kwargs)
+
+
+async def get_api_log(**kwargs):
+    return await _call(api.get_api_log, **kwargs)
+
+
+async def get_api_logs_summary():
+    return await _call(api.get_api_logs_summary)
+
+
+async def get_archive(table=None, page=1, per_page=1000, **kwargs):
+    return await _call(api.get_archive, table=table, page=page, per_page=per_page, **kwargs)
+
+
+async def get_conforming_limit(zipcode=None, normalized_type=None):
+    return await _call(api.get_conforming_limit, zipcode=zipcode, normalized_type=normalized_type)
+
+
+async def get_contact(email_address=None):
+    return await _call(api.get_contact, email_address=email_address)
+
+
+async def get_contacts(**kwargs):
+    return await _call(api.get_contacts, **kwargs)
+
+
+async def get_contacts_summary():
+    return await _call(api.get_contacts_summary)
+
+
+async def get_daily_price(zipcode=None, listing_type=None, loan_type=None):
+    return await _call(api.get_daily_price, zipcode=zipcode, listing_type=listing_type, loan_type=loan_type)
+
+
+async def get_daily_prices(zipcode=None, listing_type=None):
+    return await _call(api.get_daily_prices, zipcode=zipcode, listing_type=listing_type)
+
+
+async def get_dscr_prices(zipcode=None, listing_type=None):
+    return await _call(api.get_dscr_prices, zipcode=zipcode, listing_type=listing_type)
+
+
+async def get_print_activities():
+    return await _call(api.get_print_activities)
+
+
+async def get_listing(mls_number=None):
+    return await _call(api.get_listing, mls_number=mls_number)
+
+
+async def get_listings(**kwargs):
+    return await _call(api.get_listings, **kwargs)
+
+
+async def get_listing_page_views(**kwargs):
+    return await _call(api.get_listing_page_views, **kwargs)
+
+
+async def get_listings_summary():
+    return await _call(api.get_listings_summary)
+
+
+async def get_quotes(mls_number=""):
+    return await _call(api.get_quotes, mls_number=mls_number)
+
+
+async def get_dscr_quotes(mls_number=""):
+    return await _call(api.get_dscr_quotes, mls_number=mls_number)
+
+
+async def get_quote_urls(zipcode=None, listing_type=None):
+    return await _call(api.get_quote_urls, zipcode=zipcode, listing_type=listing_type)
+
+
+async def get_web_log(**kwargs):
+    return await _call(api.get_web_log, **kwargs)
+
+
+async def purge_api_log(log="api_log", before=""):
+    return await _call(api.purge_api_log, log=log, before=before)
+
+
+async def run_reports(**kwargs):
+    return await _call(api.run_reports, **kwargs)
+
+
+async def unsubscribe_contact(email):
+    return await _call(api.unsubscribe_contact, email)
+
+
+async def update_listing(**kwargs):
+    return await _call(api.update_listing, **kwargs)
@@ -17,7 +17,7 @@ from dotenv import load_dotenv
 from twilio.rest import Client
 import argparse
 # from dscr_db_access import add_dscr_price, set_server   # use this on RaspBerry-Pi
-from services.database_access import add_dscr_price, set_server  # use this on admin app
+from services.database_access import dscr_price_writer, set_server  # use this on admin app
 
 OS_RELEASE = platform.release()
 debugging = False
@@ -42,6 +42,7 @@ def dscr_pricing(z_list=None):
     log("     ")
     log(f"{start}  Start DSCR pricing")
     count = 0
+    journaled = 0
 
     orig_dscr_programs = [
         { "program": "house_80", "listing_type": "house", "ltv": 80, "interest_only": False, "url": house_80, "quote": None },
@@ -62,36 +63,41 @@ def dscr_pricing(z_list=None):
     status = True
 
     driver = start_selenium()
-
-    for program in dscr_programs:
-        listing_type = program.get("listing_type")
-        LTV = program.get("ltv")
-        interest_only = program.get("interest_only")
-        log(f"Scrape - {listing_type} LTV: {LTV} IO: {interest_only}")
+    # the same quote is posted once per ZIP, so batch the uploads instead of one blocking POST each
+    with dscr_price_writer(batch_size=len(z_list)) as writer:
+        for program in dscr_programs:
+            listing_type = program.get("listing_type")
+            LTV = program.get("ltv")
+            interest_only = program.get("interest_only")
+            log(f"Scrape - {listing_type} LTV: {LTV} IO: {interest_only}")
         
-        program["quote"] = scrape_dscr_price(driver, url = program.get("url"))
-        quote =  program.get("quote")
-
-        for zipcode in z_list:
-            log(f"{county_names.get(zipcode)} Rate: {quote.get('rate')} APR: {quote.get('apr')} Points: {quote.get('points_credits')} Lender: {quote.get('lender')} ")
-
-            price_params = {
-                "listing_type" : program.get("listing_type"),
-                "zipcode" : zipcode,
-                "lender" : quote.get("lender"),
-                "rate" : quote.get("rate"),
-                "apr" : quote.get("apr"),
-                "ltv" : program.get("ltv"),
-                "points_credits" : quote.get("points_credits"),
-                "interest_only" : program.get("interest_only"),
-                "min_fico" : 780
-            }
-            result, status_code = add_dscr_price(price_params)
-            if status_code == 201:
-                count += 1
-            else:
-                status = False
-                log(f"do_dscr_pricing: {result}")
+            program["quote"] = scrape_dscr_price(driver, url = program.get("url"))
+            quote =  program.get("quote")
+
+            for zipcode in z_list:
+                log(f"{county_names.get(zipcode)} Rate: {quote.get('rate')} APR: {quote.get('apr')} Points: {quote.get('points_credits')} Lender: {quote.get('lender')} ")
+
+                price_params = {
+                    "listing_type" : program.get("listing_type"),
+                    "zipcode" : zipcode,
+                    "lender" : quote.get("lender"),
+                    "rate" : quote.get("rate"),
+                    "apr" : quote.get("apr"),
+                    "ltv" : program.get("ltv"),
+                    "points_credits" : quote.get("points_credits"),
+                    "interest_only" : program.get("interest_only"),
+                    "min_fico" : 780
+                }
+                writer.add(price_params)
+
+    for price_params, result, status_code in writer.results:
+        if status_code == 201:
+            count += 1
+        elif status_code == 202:
+            journaled += 1
+        else:
+            status = False
+            log(f"do_dscr_pricing ({price_params.get('zipcode')} {price_params.get('listing_type')} LTV {price_params.get('ltv')}): {result}")
 
     if driver is not None:
         try:
@@ -104,6 +110,8 @@ def dscr_pricing(z_list=None):
     time_diff = finish - start
     minutes = int(time_diff.total_seconds() / 60)
     msg = f"Total DSCR records: {count} in {minutes} minutes"
+    if journaled:
+        msg += f" ({journaled} journaled for replay)"
     log(msg)
     text_status(msg=msg)
 
@@ -0,0 +1,113 @@
+"""
+Persistent manifest of ingested listing pages
+Maps each page's content hash and canonical URL to the MLS number and outcome of its last
+ingest, so process_pages can skip pages it has already handled without parsing them or
+calling the API, and can spot pages whose content changed since. Entries are kept per API
+server (local / remote / server): a page ingested into one is still new to the others.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", os.path.join("..", "RRR_LOGS", "ingest_manifest.db"))
+
+# Outcomes that won't change by ingesting the same bytes again. "journaled" isn't one until the
+# replay has added the listing: a page seen again is re-ingested, and check_listing finds it then.
+FINAL_OUTCOMES = {"added", "exists", "unparseable"}
+
+# The first manifest (table "pages") had no server column; its rows can't be attributed to a
+# server, so they are left behind and those pages are checked against the API once more.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested (
+    server TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    canonical_url TEXT,
+    file_name TEXT,
+    mls_number TEXT,
+    outcome TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (server, content_hash)
+);
+CREATE INDEX IF NOT EXISTS ingested_canonical ON ingested (server, canonical_url);
+"""
+
+_CANONICAL_TAG = re.compile(rb"<link\b[^>]*\brel=[\"']canonical[\"'][^>]*>", re.IGNORECASE)
+_HREF = re.compile(rb"\bhref=[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        folder = os.path.dirname(MANIFEST_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        _conn = sqlite3.connect(MANIFEST_PATH, check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(SCHEMA)
+    return _conn
+
+
+def fingerprint(file_path):
+    """(sha256 of the file bytes, canonical URL or None) without parsing the page"""
+    with open(file_path, "rb") as f:
+        return fingerprint_bytes(f.read())
+
+
+def fingerprint_bytes(data):
+    canonical_url = None
+    tag = _CANONICAL_TAG.search(data)
+    if tag:
+        href = _HREF.search(tag.group(0))
+        if href:
+            canonical_url = href.group(1).decode("utf-8", errors="replace")
+    return hashlib.sha256(data).hexdigest(), canonical_url
+
+
+def lookup(server, content_hash):
+    with _lock:
+        row = _connection().execute("SELECT * FROM ingested WHERE server = ? AND content_hash = ?",
+                                    (server, content_hash)).fetchone()
+    return dict(row) if row else None
+
+
+def previous_version(server, canonical_url, content_hash):
+    """Latest entry on server for the same canonical URL with different content, or None"""
+    if not canonical_url:
+        return None
+    with _lock:
+        row = _connection().execute(
+            "SELECT * FROM ingested WHERE server = ? AND canonical_url = ? AND content_hash != ?"
+            " ORDER BY last_seen DESC LIMIT 1",
+            (server, canonical_url, content_hash)).fetchone()
+    return dict(row) if row else None
+
+
+def record(server, content_hash, canonical_url, file_name, mls_number, outcome):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT INTO ingested (server, content_hash, canonical_url, file_name, mls_number, outcome,"
+            " first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(server, content_hash) DO UPDATE SET file_name = excluded.file_name,"
+            " mls_number = COALESCE(excluded.mls_number, ingested.mls_number), outcome = excluded.outcome,"
+            " last_seen = excluded.last_seen",
+            (server, content_hash, canonical_url, file_name, mls_number, outcome, now, now))
+        conn.commit()
+
+
+def touch(server, content_hash):
+    with _lock:
+        conn = _connection()
+        conn.execute("UPDATE ingested SET last_seen = ? WHERE server = ? AND content_hash = ?",
+                     (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), server, content_hash))
+        conn.commit()
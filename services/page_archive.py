@@ -0,0 +1,208 @@
+"""
+Compressed, indexed archive of processed and failed pages
+Instead of piling raw HTML up in RRR_LOGS/processed and failed, pages are appended to shard
+files as independent gzip members (so `zcat pages_0001.gz` still works) and a sqlite index maps
+file name, MLS number, canonical URL, content hash and date to the member's shard and offset.
+Reading a page back is one index lookup, a seek and a decompress. Identical pages are stored
+once.
+
+    python -m services.page_archive stats
+    python -m services.page_archive import C:/LOCAL_PROJECTS/RRR_LOGS/failed --kind failed
+    python -m services.page_archive find --mls 12345
+    python -m services.page_archive restore 42 C:/LOCAL_PROJECTS/RRR_LOGS/pages
+"""
+
+import argparse
+import gzip
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from services import ingest_manifest
+
+ARCHIVE_FOLDER = os.getenv("PAGE_ARCHIVE_FOLDER", os.path.join("..", "RRR_LOGS", "page_archive"))
+SHARD_BYTES = int(float(os.getenv("PAGE_ARCHIVE_SHARD_MB", "256")) * 1024 * 1024)
+COMPRESS_LEVEL = 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    shard TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    mls_number TEXT,
+    canonical_url TEXT,
+    content_hash TEXT NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_file_name ON pages (file_name);
+CREATE INDEX IF NOT EXISTS pages_mls ON pages (mls_number);
+CREATE INDEX IF NOT EXISTS pages_canonical ON pages (canonical_url);
+CREATE INDEX IF NOT EXISTS pages_hash ON pages (content_hash);
+"""
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _connection():
+    global _conn
+    if _conn is None:
+        os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+        _conn = sqlite3.connect(os.path.join(ARCHIVE_FOLDER, "index.db"), check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(SCHEMA)
+    return _conn
+
+
+def _current_shard(incoming):
+    """Shard to append incoming bytes to, starting a new one once the last is SHARD_BYTES"""
+    shards = sorted(name for name in os.listdir(ARCHIVE_FOLDER) if name.startswith("pages_") and name.endswith(".gz"))
+    if shards:
+        last = shards[-1]
+        size = os.path.getsize(os.path.join(ARCHIVE_FOLDER, last))
+        if size == 0 or size + incoming <= SHARD_BYTES:
+            return last
+        number = int(last[len("pages_"):-len(".gz")]) + 1
+    else:
+        number = 1
+    return f"pages_{number:04d}.gz"
+
+
+def archive_bytes(data, file_name, kind, mls_number=None):
+    """Add one page to the archive; returns its index row id"""
+    content_hash, canonical_url = ingest_manifest.fingerprint_bytes(data)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _lock:
+        conn = _connection()
+        if conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone() is None:
+            member = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+            shard = _current_shard(len(member))
+            with open(os.path.join(ARCHIVE_FOLDER, shard), "ab") as f:
+                offset = f.tell()
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+            conn.execute("INSERT INTO blobs (content_hash, shard, offset, length, size) VALUES (?, ?, ?, ?, ?)",
+                         (content_hash, shard, offset, len(member), len(data)))
+        cursor = conn.execute(
+            "INSERT INTO pages (file_name, kind, mls_number, canonical_url, content_hash, archived_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (file_name, kind, mls_number, canonical_url, content_hash, now))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def archive_file(file_path, kind, mls_number=None):
+    """Archive a page file and delete it; returns its index row id"""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    page_id = archive_bytes(data, os.path.basename(file_path), kind, mls_number)
+    os.remove(file_path)
+    return page_id
+
+
+def find(file_name=None, mls_number=None, canonical_url=None, content_hash=None, kind=None, limit=50):
+    """Index rows matching every given field, newest first"""
+    filters = {"file_name": file_name, "mls_number": mls_number, "canonical_url": canonical_url,
+               "content_hash": content_hash, "kind": kind}
+    clauses = [f"p.{column} = ?" for column, value in filters.items() if value is not None]
+    values = [value for value in filters.values() if value is not None]
+    sql = ("SELECT p.*, b.shard, b.offset, b.length, b.size FROM pages p JOIN blobs b USING (content_hash)"
+           + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY p.id DESC LIMIT ?")
+    with _lock:
+        rows = _connection().execute(sql, values + [limit]).fetchall()
+    return [dict(row) for row in rows]
+
+
+def find_by_id(page_id):
+    with _lock:
+        row = _connection().execute("SELECT * FROM pages WHERE id = ?", (page_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"No archived page {page_id}")
+    return dict(row)
+
+
+def read_page(page_id):
+    """The archived bytes of index row page_id"""
+    with _lock:
+        row = _connection().execute(
+            "SELECT b.shard, b.offset, b.length FROM pages p JOIN blobs b USING (content_hash) WHERE p.id = ?",
+            (page_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"No archived page {page_id}")
+    with open(os.path.join(ARCHIVE_FOLDER, row["shard"]), "rb") as f:
+        f.seek(row["offset"])
+        return gzip.decompress(f.read(row["length"]))
+
+
+def restore(page_id, folder):
+    """Write an archived page back into folder (e.g. PAGES_FOLDER to reprocess it); returns its path"""
+    row = find_by_id(page_id)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, row["file_name"])
+    with open(path, "wb") as f:
+        f.write(read_page(page_id))
+    return path
+
+
+def import_folder(folder, kind):
+    """Move every file already sitting in folder (the old processed/failed folders) into the archive"""
+    count = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith((".html", ".htm")):
+                archive_file(entry.path, kind)
+                count += 1
+    return count
+
+
+def stats():
+    with _lock:
+        conn = _connection()
+        pages, = conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        blobs, stored, raw = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(size), 0)"
+                                          " FROM blobs").fetchone()
+        kinds = dict(conn.execute("SELECT kind, COUNT(*) FROM pages GROUP BY kind").fetchall())
+    return {"pages": pages, "unique_pages": blobs, "raw_bytes": raw, "stored_bytes": stored,
+            "ratio": round(raw / stored, 1) if stored else 0.0, "kinds": kinds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed archive of processed and failed pages")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats")
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("folder")
+    import_parser.add_argument("--kind", choices=["processed", "failed"], required=True)
+    find_parser = commands.add_parser("find")
+    find_parser.add_argument("--file")
+    find_parser.add_argument("--mls")
+    find_parser.add_argument("--url")
+    find_parser.add_argument("--hash")
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument("id", type=int)
+    restore_parser.add_argument("folder")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        print(stats())
+    elif args.command == "import":
+        print(f"✅ Archived {import_folder(args.folder, args.kind)} pages from {args.folder}")
+    elif args.command == "find":
+        for row in find(args.file, args.mls, args.url, args.hash):
+            print(f"{row['id']:>7}  {row['archived_at']}  {row['kind']:<9} MLS {row['mls_number']}  {row['file_name']}")
+    else:
+        print(f"✅ Restored {restore(args.id, args.folder)}")
+
+
+if __name__ == "__main__":
+    main()
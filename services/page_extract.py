@@ -0,0 +1,183 @@
+"""
+Fast-path extraction for saved homes.com property pages
+Everything process_listings needs sits in four places: the ld+json script, the canonical link,
+the p.mls-number spans and the agent license spans. This memory-maps the file and slices those
+regions out with targeted scans instead of building a tree. Whenever a page doesn't look the
+way the scans expect, they return None and the caller falls back to the full parser.
+"""
+
+import bisect
+import html
+import mmap
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+_OPEN_TAG = {name: re.compile(rb"<" + name + rb"\b([^>]*)>", re.IGNORECASE)
+             for name in (b"script", b"link", b"p", b"span")}
+_CLOSE_TAG = {name: re.compile(rb"</" + name + rb"\s*>", re.IGNORECASE)
+              for name in (b"script", b"style", b"p", b"span")}
+_ATTRIBUTE = re.compile(rb"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+_OPAQUE_START = re.compile(rb"<!--|<(script|style)\b[^>]*>", re.IGNORECASE)
+
+_MLS_CLASS = re.compile(rb"mls-number")
+_LICENSE_CLASS = re.compile(rb"agent-information-license-number")
+_CANONICAL = re.compile(rb"canonical", re.IGNORECASE)
+
+
+class Unreadable(Exception):
+    """The page doesn't match what the scans expect; parse it with the full parser instead"""
+
+
+class _Page:
+    """A page's bytes plus the spans a parser wouldn't read tags from (comments, script/style bodies)"""
+
+    def __init__(self, data):
+        self.data = data
+        self.opaque = []
+        position = 0
+        while True:
+            match = _OPAQUE_START.search(data, position)
+            if not match:
+                break
+            if match.group(1) is None:
+                close = data.find(b"-->", match.end())
+                end = len(data) if close == -1 else close + 3
+                self.opaque.append((match.start(), end))
+            else:
+                close = _CLOSE_TAG[match.group(1).lower()].search(data, match.end())
+                end = len(data) if close is None else close.start()
+                self.opaque.append((match.end(), end))
+            position = max(end, match.end())
+        self.opaque_starts = [start for start, _ in self.opaque]
+
+    def visible(self, position):
+        index = bisect.bisect_right(self.opaque_starts, position) - 1
+        return index < 0 or position >= self.opaque[index][1]
+
+    def tags(self, name, start=0, end=None):
+        """(attrs, end of the open tag) for every visible <name ...> between start and end"""
+        for match in _OPEN_TAG[name].finditer(self.data, start, len(self.data) if end is None else end):
+            if self.visible(match.start()):
+                yield _attributes(match.group(1)), match.end()
+
+    def count(self, pattern):
+        """Visible occurrences of a pattern"""
+        return sum(1 for match in pattern.finditer(self.data) if self.visible(match.start()))
+
+    def inner(self, name, start, end=None):
+        """Bytes from start up to the close tag"""
+        close = _CLOSE_TAG[name].search(self.data, start, len(self.data) if end is None else end)
+        if not close:
+            raise Unreadable(f"unclosed <{name.decode()}>")
+        return self.data[start:close.start()]
+
+
+def _attributes(raw):
+    """Attributes of an open tag as {lowercased name: unescaped value}, like the tree builders give"""
+    attrs = {}
+    for match in _ATTRIBUTE.finditer(raw.rstrip(b"/")):
+        name = match.group(1).decode("utf-8", errors="replace").lower()
+        value = next((group for group in match.group(2, 3, 4) if group is not None), b"")
+        attrs[name] = html.unescape(value.decode("utf-8", errors="replace"))
+    return attrs
+
+
+def _text(raw):
+    """Text of an element that holds no markup (nested tags need the real parser)"""
+    if b"<" in raw:
+        raise Unreadable("markup inside element")
+    return html.unescape(raw.decode("utf-8"))
+
+
+def _json_text(page):
+    for attrs, body_start in page.tags(b"script"):
+        if attrs.get("type") == "application/ld+json":
+            json_text = page.inner(b"script", body_start)
+            if not json_text.strip():
+                raise Unreadable("empty ld+json script")
+            return json_text.decode("utf-8")
+    raise Unreadable("no ld+json script")
+
+
+def _canonical(page):
+    """(found, href): found is False only when the page has no canonical link at all"""
+    for attrs, _ in page.tags(b"link"):
+        if "canonical" in attrs.get("rel", "").split():
+            return True, attrs.get("href")
+    return page.count(_CANONICAL) > 0, None
+
+
+def _mls_spans(page):
+    """Texts of the spans in the first p.mls-number, or None if the page has none"""
+    for attrs, body_start in page.tags(b"p"):
+        if "mls-number" not in attrs.get("class", "").split():
+            continue
+        paragraph_end = body_start + len(page.inner(b"p", body_start))
+        return [_text(page.inner(b"span", span_start, paragraph_end))
+                for _, span_start in page.tags(b"span", body_start, paragraph_end)]
+    if page.count(_MLS_CLASS):
+        raise Unreadable("mls-number outside a <p class>")
+    return None
+
+
+def _licenses(page):
+    """Texts of the license spans in page order"""
+    licenses = [_text(page.inner(b"span", body_start))
+                for attrs, body_start in page.tags(b"span")
+                if "agent-information-license-number" in attrs.get("class", "").split()]
+    # a license class the scan didn't see (odd markup) means the agents could get the wrong license
+    if page.count(_LICENSE_CLASS) != len(licenses):
+        raise Unreadable("license count mismatch")
+    return licenses
+
+
+def scan_regions(data):
+    """
+    Regions of a page from its bytes: {"json_text", "canonical_url", "mls_spans", "licenses"},
+    or None if any of them can't be read reliably without the full parser.
+    mls_spans is None when the page has no p.mls-number.
+    """
+    try:
+        page = _Page(data)
+        found, canonical_url = _canonical(page)
+        if found and canonical_url is None:
+            raise Unreadable("canonical link without href")
+        return {
+            "json_text": _json_text(page),
+            "canonical_url": canonical_url,
+            "mls_spans": _mls_spans(page),
+            "licenses": _licenses(page),
+        }
+    except (Unreadable, UnicodeDecodeError):
+        return None
+
+
+def extract_regions(file_path):
+    """scan_regions over a memory-mapped page; None if the caller should use the full parser"""
+    with open(file_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return None
+        with data:
+            return scan_regions(data)
+
+
+def canonical_url(file_path):
+    """href of the page's canonical link, or None; only parses the page if the scan can't tell"""
+    with open(file_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+        with data:
+            found, href = _canonical(_Page(data))
+            if not found or href is not None:
+                return href
+            raw = data[:]
+
+    soup = BeautifulSoup(raw.decode("utf-8", errors="ignore"), "html.parser", parse_only=SoupStrainer("link"))
+    tag = soup.find("link", rel="canonical")
+    return tag["href"] if tag and tag.has_attr("href") else None
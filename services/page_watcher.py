@@ -0,0 +1,280 @@
+"""
+Watch-folder streaming ingest
+Watches the downloads folder and streams every new page through place (rename) -> read ->
+parse -> dedupe -> upload -> disposition as soon as it has finished downloading, instead of
+waiting for the next do_scrape + do_process_pages batch.
+
+A page counts as finished once its size and mtime have not changed for WATCH_SETTLE_SECONDS
+(browsers write big pages in bursts, and every change restarts the wait). Finished pages go
+on a bounded queue of WATCH_QUEUE_SIZE; when the ingest workers fall behind, pages stay
+pending in the folder rather than piling up in memory.
+
+Pages are placed in and ingested from the watcher's own folder (WATCH_PAGES_FOLDER, by default
+"watching" next to PAGES_FOLDER), so a batch process_pages never picks up a page the watcher is
+working on. Pages that went in are then handed over to PAGES_FOLDER, where a batch run would
+have left them; so are pages an interrupted watcher left behind, at the next start.
+
+Change notification uses watchdog (inotify on Linux, ReadDirectoryChangesW on Windows) when it
+is installed (pip install watchdog); without it the folder is polled every WATCH_POLL_INTERVAL.
+
+    python -m services.page_watcher
+"""
+
+import contextvars
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from services import process_listings, scrape_homes
+from services.my_logger import log
+
+WATCH_SETTLE_SECONDS = float(os.getenv("WATCH_SETTLE_SECONDS", "2"))
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "1"))
+WATCH_QUEUE_SIZE = int(os.getenv("WATCH_QUEUE_SIZE", "64"))
+WATCH_WORKERS = int(os.getenv("WATCH_WORKERS", "2"))
+WATCH_PAGES_FOLDER = os.getenv("WATCH_PAGES_FOLDER", "")
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+class PageWatcher:
+    def __init__(self, folder=None, pages_folder=None, settle=None, poll_interval=None, queue_size=None,
+                 workers=None, use_events=True):
+        self.folder = folder or scrape_homes.SOURCE_FOLDER
+        self.pages_folder = (pages_folder or WATCH_PAGES_FOLDER
+                             or os.path.join(os.path.dirname(process_listings.PAGES_FOLDER), "watching"))
+        self.settle = WATCH_SETTLE_SECONDS if settle is None else settle
+        self.poll_interval = poll_interval or WATCH_POLL_INTERVAL
+        self.workers = max(1, workers or WATCH_WORKERS)
+        self.queue = queue.Queue(maxsize=queue_size or WATCH_QUEUE_SIZE)
+        self.use_events = use_events and Observer is not None
+        self.lock = threading.Lock()
+        self.pending = {}   # name -> (size, mtime_ns, unchanged since)
+        self.done = {}      # name -> (size, mtime_ns) of the version already queued
+        self.dirty = set()  # names the observer reported since the last check
+        self.outcomes = {"succeeded": 0, "failed": 0, "skipped": 0, "changed": 0}
+        self.placed = {}
+        self.recent = []
+        self.started_at = None
+        self._stop = threading.Event()
+        self._draining = threading.Event()
+        self._threads = []
+        self._observer = None
+        self._ingest, self.stages = process_listings.page_stream(self.outcomes, self.pages_folder)
+
+    # ---- noticing files ----
+
+    def _notice(self, name):
+        if scrape_homes.is_download_page(name):
+            with self.lock:
+                self.dirty.add(name)
+
+    def _scan(self):
+        """Names to look at this round: every page in the folder when polling, else what changed"""
+        with self.lock:
+            names = set(self.pending) | self.dirty
+            self.dirty.clear()
+        if not self.use_events:
+            with os.scandir(self.folder) as entries:
+                present = {entry.name for entry in entries if scrape_homes.is_download_page(entry.name) and entry.is_file()}
+            names.update(present)
+            with self.lock:
+                # forget pages that have left the folder
+                for name in set(self.done) - present:
+                    del self.done[name]
+        return names
+
+    def _check(self):
+        now = time.monotonic()
+        for name in self._scan():
+            try:
+                stat = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                # gone again (a browser's temporary file, or moved away)
+                with self.lock:
+                    self.pending.pop(name, None)
+                    self.done.pop(name, None)
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            with self.lock:
+                if self.done.get(name) == signature:
+                    self.pending.pop(name, None)
+                    continue
+                previous = self.pending.get(name)
+                if previous is None or previous[:2] != signature:
+                    # new or still growing: (re)start the settle wait
+                    self.pending[name] = signature + (now,)
+                    continue
+                if stat.st_size == 0 or now - previous[2] < self.settle:
+                    continue
+            try:
+                self.queue.put_nowait(name)
+            except queue.Full:
+                # workers are behind; the page stays pending and is offered again next round
+                continue
+            with self.lock:
+                self.pending.pop(name, None)
+                self.done[name] = signature
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._check()
+            except Exception as e:
+                log(f"❌ Page watcher check failed: {e}")
+
+    # ---- ingesting ----
+
+    def ingest(self, name):
+        """
+        place (rename) -> read -> parse -> dedupe -> upload -> disposition for one downloaded page.
+        A download whose exact bytes the ingest manifest already has (e.g. every page still in the
+        folder when the watcher restarts) is a duplicate: it isn't placed or ingested again.
+        """
+        started = time.perf_counter()
+        path = os.path.join(self.folder, name)
+        try:
+            if process_listings.check_manifest(path)[1]:
+                placed, file_name = "duplicate", None
+            else:
+                placed, file_name = scrape_homes.place_page(path, name, self.pages_folder)
+        except OSError as e:
+            placed, file_name = "error", None
+            log(f"❌ Could not place {name}: {e}")
+        outcome = placed
+        if placed == "copied":
+            item = self._ingest(file_name)
+            outcome = "skipped" if item.get("skipped") else "succeeded" if item.get("success") else "failed"
+            self._hand_over(file_name, ingested=True)
+        with self.lock:
+            self.placed[placed] = self.placed.get(placed, 0) + 1
+            self.recent = ([{"time": datetime.now().strftime("%H:%M:%S"), "file": file_name or name,
+                             "outcome": outcome, "seconds": round(time.perf_counter() - started, 2)}]
+                           + self.recent)[:20]
+        log(f"👀 {name}: {outcome} in {time.perf_counter() - started:.2f}s")
+        return outcome
+
+    def _hand_over(self, file_name, ingested):
+        """Move a page from the watcher's folder to PAGES_FOLDER (failed pages were already moved away)"""
+        src = os.path.join(self.pages_folder, file_name)
+        if not os.path.exists(src):
+            return
+        dst = os.path.join(process_listings.PAGES_FOLDER, file_name)
+        if not os.path.exists(dst):
+            shutil.move(src, dst)
+        elif ingested:
+            # PAGES_FOLDER has its own copy; this one is in the manifest and the downloads backup
+            os.remove(src)
+        else:
+            log(f"⚠️ {file_name} is also in {process_listings.PAGES_FOLDER}, left in {self.pages_folder}")
+
+    def _work(self):
+        while True:
+            try:
+                name = self.queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self._draining.is_set():
+                    return
+                continue
+            try:
+                self.ingest(name)
+            except Exception as e:
+                log(f"❌ Page watcher failed on {name}: {e}")
+
+    # ---- lifecycle ----
+
+    def start(self):
+        """Start watching; threads run in copies of the caller's context, so they keep its API server"""
+        os.makedirs(self.pages_folder, exist_ok=True)
+        os.makedirs(process_listings.PAGES_FOLDER, exist_ok=True)
+        with os.scandir(self.pages_folder) as entries:
+            leftovers = [entry.name for entry in entries if entry.is_file()]
+        for file_name in leftovers:
+            # placed by an earlier watcher that stopped before ingesting them
+            self._hand_over(file_name, ingested=False)
+        if leftovers:
+            log(f"👀 Handed {len(leftovers)} pages left in {self.pages_folder} over to process_pages")
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._stop.clear()
+        self._draining.clear()
+        if self.use_events:
+            watcher = self
+
+            class Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    if not event.is_directory:
+                        watcher._notice(os.path.basename(getattr(event, "dest_path", "") or event.src_path))
+
+            self._observer = Observer()
+            self._observer.schedule(Handler(), self.folder, recursive=False)
+            self._observer.start()
+            # pages that were already there when the watcher started
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    self._notice(entry.name)
+
+        targets = [(self._watch, "page-watcher")] + [(self._work, f"page-ingest-{n}") for n in range(self.workers)]
+        for target, name in targets:
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log(f"👀 Watching {self.folder} ({'events' if self.use_events else 'polling'}, "
+            f"{self.workers} workers, settle {self.settle}s)")
+
+    def stop(self):
+        """Stop noticing new pages, let the workers finish everything already queued"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        # once the watch thread is gone nothing else is queued; workers exit when the queue is empty
+        for thread in self._threads[:1]:
+            thread.join()
+        self._draining.set()
+        for thread in self._threads[1:]:
+            thread.join()
+        self._threads = []
+        log("👀 Page watcher stopped")
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def status(self):
+        with self.lock:
+            return {
+                "running": self.running,
+                "folder": self.folder,
+                "mode": "events" if self.use_events else "polling",
+                "started_at": self.started_at,
+                "pending": len(self.pending),
+                "queued": self.queue.qsize(),
+                "outcomes": dict(self.outcomes),
+                "placed": dict(self.placed),
+                "recent": list(self.recent),
+            }
+
+
+def main():
+    from services.database_access import set_server
+
+    set_server("local")
+    watcher = PageWatcher()
+    watcher.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Small staged pipeline: a source feeds a chain of stages connected by bounded queues
+Each stage runs its function in its own worker threads, so a slow stage fills the queue in
+front of it and the stages upstream block instead of piling items up in memory. Every stage
+keeps counters, its queue depth and time spent in the function, so a run shows where the
+bottleneck is.
+
+Items are dicts. A stage function gets an item and returns it (changed or not); an item with
+"done" set skips the remaining stage functions and goes straight through to the last stage,
+which always sees every item.
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+
+_STOP = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1, always=False):
+        """always: run func even for items already marked done (the final disposition stage)"""
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.always = always
+        self.queue = None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.processed = 0
+        self.passed = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_depth = 0
+
+    def process(self, item):
+        if item.get("done") and not self.always:
+            with self.lock:
+                self.passed += 1
+            return item
+        started = time.perf_counter()
+        try:
+            item = self.func(item)
+            failed = False
+        except Exception as e:
+            item.update(done=True, success=False, error=f"{self.name}: {e}")
+            failed = True
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.processed += 1
+            self.errors += failed
+            self.busy += elapsed
+        return item
+
+    def stats(self, elapsed):
+        depth = self.queue.qsize() if self.queue is not None else 0
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "passed": self.passed,
+            "errors": self.errors,
+            "queue": depth,
+            "max_queue": self.max_depth,
+            "busy_seconds": round(self.busy, 2),
+            "avg_ms": round(self.busy / self.processed * 1000, 1) if self.processed else 0.0,
+            # share of the stage's worker time spent working; the busiest stage is the bottleneck
+            "utilization": round(self.busy / (elapsed * self.workers), 2) if elapsed else 0.0,
+        }
+
+
+class Pipeline:
+    def __init__(self, stages, queue_size=None, source_name="source"):
+        self.stages = stages
+        self.source_name = source_name
+        self.queue_size = queue_size or PIPELINE_QUEUE_SIZE
+        self.started = None
+        self.source_count = 0
+        self.source_seconds = 0.0
+
+    def snapshot(self):
+        """Per-stage stats, with the source as the first entry"""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        source = {"stage": self.source_name, "workers": 1, "processed": self.source_count, "passed": 0, "errors": 0,
+                  "queue": 0, "max_queue": 0, "busy_seconds": round(self.source_seconds, 2),
+                  "avg_ms": round(self.source_seconds / self.source_count * 1000, 1) if self.source_count else 0.0,
+                  "utilization": round(self.source_seconds / elapsed, 2) if elapsed else 0.0}
+        return [source] + [stage.stats(elapsed) for stage in self.stages]
+
+    def _items(self, source):
+        """Iterate the source, timing how long producing each item takes"""
+        iterator = iter(source)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.source_seconds += time.perf_counter() - started
+            self.source_count += 1
+            yield item
+
+    def run(self, source, threaded=True, on_progress=None, interval=1.0):
+        """
+        Push every item of source through the stages. threaded=False runs each item through all
+        stages on the calling thread (same stages and stats, no overlap). on_progress(snapshot)
+        is called every interval seconds while running and once at the end.
+        """
+        self.started = time.perf_counter()
+        self.source_count, self.source_seconds = 0, 0.0
+        for stage in self.stages:
+            stage.reset()
+
+        if not threaded:
+            reported = self.started
+            for item in self._items(source):
+                for stage in self.stages:
+                    item = stage.process(item)
+                if on_progress and time.perf_counter() - reported >= interval:
+                    reported = time.perf_counter()
+                    on_progress(self.snapshot())
+            snapshot = self.snapshot()
+            if on_progress:
+                on_progress(snapshot)
+            return snapshot
+
+        for stage in self.stages:
+            stage.queue = queue.Queue(maxsize=self.queue_size)
+        threads = []
+        for index, stage in enumerate(self.stages):
+            following = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            remaining = [stage.workers]
+            for number in range(stage.workers):
+                # each worker runs in its own copy of the caller's context (bound API server)
+                thread = threading.Thread(target=contextvars.copy_context().run,
+                                          args=(self._work, stage, following, remaining),
+                                          name=f"pipeline-{stage.name}-{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        finished = threading.Event()
+        monitor = None
+        if on_progress:
+            def report():
+                while not finished.wait(interval):
+                    on_progress(self.snapshot())
+            monitor = threading.Thread(target=report, name="pipeline-monitor", daemon=True)
+            monitor.start()
+
+        first = self.stages[0]
+        try:
+            for item in self._items(source):
+                first.queue.put(item)
+        finally:
+            for _ in range(first.workers):
+                first.queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+            finished.set()
+            if monitor:
+                monitor.join()
+
+        snapshot = self.snapshot()
+        for stage in self.stages:
+            stage.queue = None
+        if on_progress:
+            on_progress(snapshot)
+        return snapshot
+
+    def _work(self, stage, following, remaining):
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                break
+            stage.max_depth = max(stage.max_depth, stage.queue.qsize() + 1)
+            item = stage.process(item)
+            if following is not None:
+                following.queue.put(item)
+        # the last worker of a stage to stop tells the next stage there's nothing more coming
+        with stage.lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and following is not None:
+            for _ in range(following.workers):
+                following.queue.put(_STOP)
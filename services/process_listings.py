@@ -1,12 +1,19 @@
 import os
 import json
 import shutil
+import time
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
-from services.database_access import add_contact, add_listing_dict, add_colister, set_server, get_listing
+from bs4 import BeautifulSoup, SoupStrainer
+from services.database_access import add_listing_dict, add_colister, set_server, current_server, get_listing
+from services.database_access import RETRY_STATUS_CODES, journal_write, register_replay, iter_listings, APIError
 from services.scrape_homes import count_filtered_pages
 from datetime import datetime
 from services.my_logger import log
+from services import ingest_manifest, contact_resolver, page_extract, page_archive
+from services.pipeline import Pipeline, Stage
 
 
 PAGES_FOLDER = r"C:/LOCAL_PROJECTS/RRR_LOGS/pages"
@@ -14,6 +21,30 @@ PROCESSED_FOLDER = r"C:/LOCAL_PROJECTS/RRR_LOGS/processed"
 FAILED_FOLDER = r"C:/LOCAL_PROJECTS/RRR_LOGS/failed"
 LOGS_FOLDER = r"C:/LOCAL_PROJECTS/RRR_LOGS/logs"
 
+# Parallel ingest: pages are parsed in a process pool and uploaded by a pool of pipeline threads
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_API_WORKERS = int(os.getenv("INGEST_API_WORKERS", "8"))
+
+# Skip pages whose exact bytes were already ingested (see services/ingest_manifest.py)
+INGEST_MANIFEST = os.getenv("INGEST_MANIFEST", "1") == "1"
+
+# Pull the server's MLS numbers once per run instead of a get_listing per page
+INGEST_BULK_CHECK = os.getenv("INGEST_BULK_CHECK", "1") == "1"
+_known_lock = threading.Lock()
+
+# "lxml" is a faster C parser if installed; html.parser is the reference the output is checked against
+HTML_PARSER = os.getenv("HTML_PARSER", "html.parser")
+
+# Pack processed/failed pages into page_archive's compressed shards instead of moving the raw files
+PAGE_ARCHIVE = os.getenv("PAGE_ARCHIVE", "1") == "1"
+
+# Read pages with page_extract's byte scans, falling back to the parser for pages they can't read
+PAGE_FAST_PATH = os.getenv("PAGE_FAST_PATH", "1") == "1"
+
+# Only these tags (and what's inside them) are kept in the tree: the JSON-LD script, canonical link,
+# mls-number paragraph and agent license spans
+LISTING_TAGS = SoupStrainer(["script", "link", "p", "span"])
+
 
 def extract_details_url_from_offers(json_data):
     if isinstance(json_data, dict) and "@graph" in json_data:
@@ -29,7 +60,7 @@ def extract_details_url_from_offers(json_data):
     return None
 
 
-def get_agents(html_content, property_data):
+def get_agents(licenses, property_data):
     agent_list = property_data.get("offers", {}).get("offeredBy", [])
     if isinstance(agent_list, dict):
         agent_list = [agent_list]
@@ -46,13 +77,11 @@ def get_agents(html_content, property_data):
             "license": ""
         })
 
-    soup = BeautifulSoup(html_content, "html.parser")
-    license_tags = soup.find_all('span', class_='agent-information-license-number')
-    for i, tag in enumerate(license_tags):
+    for i, text in enumerate(licenses):
         if i < len(agents):
-            agents[i]["license"] = tag.text.replace("License #", "").strip()
+            agents[i]["license"] = text.replace("License #", "").strip()
 
-    log(f"🆔 Found {len(license_tags)} license tags, {len(agents)} agents.")
+    log(f"🆔 Found {len(licenses)} license tags, {len(agents)} agents.")
     return agents
 
 
@@ -60,24 +89,38 @@ def get_files_in_folder(folder_path):
     return [f.name for f in Path(folder_path).iterdir() if f.is_file()]
 
 
-def get_json_data(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
+def parse_page(html_content):
+    """Parse a saved page once; page_regions reads everything get_details needs from this tree"""
+    return BeautifulSoup(html_content, HTML_PARSER, parse_only=LISTING_TAGS)
+
+
+def page_regions(soup):
+    """The same regions page_extract.scan_regions slices out of the raw bytes, read from the tree"""
     json_script = soup.find("script", type="application/ld+json")
-    return json.loads(json_script.string)
+    canonical = soup.find("link", rel="canonical")
+    mls_tag = soup.find('p', class_="mls-number")
+    return {
+        "json_text": json_script.string if json_script else None,
+        "canonical_url": canonical.get("href") if canonical else None,
+        "mls_spans": [span.text for span in mls_tag.find_all('span')] if mls_tag else None,
+        "licenses": [tag.text for tag in soup.find_all('span', class_='agent-information-license-number')],
+    }
 
 
 def get_details(html_content):
+    return details_from_regions(page_regions(parse_page(html_content)))
+
+
+def details_from_regions(regions):
+    """(listing, agents) from a page's regions, or None if the page has no usable listing JSON"""
     listing = {}
-    soup = BeautifulSoup(html_content, "html.parser")
 
     try:
-        json_data = get_json_data(html_content)
+        json_data = json.loads(regions["json_text"])
         details_url = extract_details_url_from_offers(json_data)
 
-        if not details_url:
-            canonical = soup.find("link", rel="canonical")
-            if canonical and canonical.get("href"):
-                details_url = canonical["href"]
+        if not details_url and regions["canonical_url"]:
+            details_url = regions["canonical_url"]
 
         property_data = next((item for item in json_data["@graph"] if "RealEstateListing" in item["@type"]), None)
         if not property_data:
@@ -100,14 +143,12 @@ def get_details(html_content):
         listing_type = "house" if entity_type == "SingleFamilyResidence" else "condo"
 
         mls_number = "N/A"
-        try:
-            mls_tag = soup.find('p', class_="mls-number")
-            spans = mls_tag.find_all('span')
-            if len(spans) > 1:
-                mls_number = spans[1].text.strip()
-                log(f"mls-number found: {mls_number}")
-        except Exception:
+        spans = regions["mls_spans"]
+        if spans is None:
             log("⚠️ MLS Number not found")
+        elif len(spans) > 1:
+            mls_number = spans[1].strip()
+            log(f"mls-number found: {mls_number}")
 
         listing = {
             "mls_number": mls_number,
@@ -126,93 +167,417 @@ def get_details(html_content):
         log(f"❌ Failed to extract detail_data: {e}")
         return None
 
-    agents = get_agents(html_content, property_data)
+    agents = get_agents(regions["licenses"], property_data)
     return listing, agents
 
 
-def move_to_failed(file_name):
+def move_to_failed(file_name, mls_number=None, folder=None):
+    src = os.path.join(folder or PAGES_FOLDER, file_name)
+    if PAGE_ARCHIVE:
+        page_id = page_archive.archive_file(src, "failed", mls_number)
+        log(f"❌ Archived as failed (#{page_id}): {file_name}")
+        return
     os.makedirs(FAILED_FOLDER, exist_ok=True)
-    src = os.path.join(PAGES_FOLDER, file_name)
     dst = os.path.join(FAILED_FOLDER, file_name)
     shutil.move(src, dst)
     log(f"❌ Moved to failed: {file_name}")
 
 
-def move_to_processed(file_name):
+def move_to_processed(file_name, mls_number=None, folder=None):
+    src = os.path.join(folder or PAGES_FOLDER, file_name)
+    if PAGE_ARCHIVE:
+        page_id = page_archive.archive_file(src, "processed", mls_number)
+        log(f"📂 Archived as processed (#{page_id}): {file_name}")
+        return
     os.makedirs(PROCESSED_FOLDER, exist_ok=True)
-    src = os.path.join(PAGES_FOLDER, file_name)
     dst = os.path.join(PROCESSED_FOLDER, file_name)
     shutil.move(src, dst)
     log(f"📂 Moved to processed: {file_name}")
 
 
-def new_listing(listing, agents):
-    log(f"new_listing: {listing["mls_number"]}")
-    
-    found_listing, status_code = get_listing(listing["mls_number"])
+def fetch_known_mls_numbers():
+    """Every MLS number on the server, pulled through get_listings paging; None if that fails"""
+    try:
+        return {row.get("mls_number") for row in iter_listings() if isinstance(row, dict)}
+    except APIError as e:
+        log(f"⚠️ Bulk MLS lookup failed, checking listings one by one: {e}")
+        return None
+
+
+def _claim_mls(known, mls_number):
+    """False if the listing is already known; otherwise mark it taken so repeat pages in the run see it"""
+    with _known_lock:
+        if mls_number in known:
+            return False
+        known.add(mls_number)
+        return True
+
+
+def _release_mls(known, mls_number):
+    """Give back a claim whose listing didn't go in, so a repeat page in the run can try again"""
+    if known is not None:
+        with _known_lock:
+            known.discard(mls_number)
+
+
+def _is_placeholder_mls(mls_number):
+    # get_details falls back to "N/A" when the page has no MLS number
+    return not mls_number or mls_number.strip().upper() == "N/A"
+
+
+def check_listing(mls_number, known=None):
+    """
+    Whether a listing still has to be added: 200 if it exists, the get_listing status otherwise
+    (404 when it's new). known is the run's set of MLS numbers from fetch_known_mls_numbers();
+    a new number is claimed in it so repeat pages in the run see it. Without it, or for a
+    placeholder like "N/A" that many pages share, the listing is checked with get_listing.
+    """
+    if known is not None and not _is_placeholder_mls(mls_number):
+        if _claim_mls(known, mls_number):
+            return 404
+        log(f"Listing exists: {mls_number}")
+        return 200
+    found_listing, status_code = get_listing(mls_number)
     if status_code == 200:
-        log(f"Listing exists: {listing["mls_number"]}")
-        return False
-    
-    lister, status_code = add_contact(agents[0])
-    log("add_contact lister")
-    if status_code != 201:
-        return False
+        log(f"Listing exists: {mls_number}")
+    return status_code
+
+
+def add_listing_records(listing, agents):
+    """
+    Add lister, listing and co-lister; returns the status of the call that ended the chain.
+    Once the listing is in, a co-lister the server can't take is journaled as a step of its own
+    (the listing itself doesn't need replaying) and the listing counts as added.
+    """
+    lister, status_code = contact_resolver.resolve_contact(agents[0])
+    log("resolve_contact lister")
+    if status_code not in (200, 201):
+        return status_code
 
     listing["lister_id"] = lister.get("id")
     new_listing, status_code = add_listing_dict(listing)
     if status_code != 201:
-        return False
+        return status_code
 
     if len(agents) > 1:
-        colister, status_code = add_contact(agents[1])
-        log("add_contact colister")
-        if status_code == 201:
-            new_colister, status_code = add_colister(
-                mls_number=listing["mls_number"],
-                colister_id=colister["id"]
-            )
-            log("add_colister")
-            return status_code == 201
-        return False
-
-    return True
+        status_code = add_colister_record(listing["mls_number"], agents[1])
+        if status_code in RETRY_STATUS_CODES:
+            journal, journal_status = journal_write("colister", {"mls_number": listing["mls_number"], "agent": agents[1]})
+            if journal_status == 202:
+                log(f"📓 Journaled co-lister of {listing["mls_number"]} for replay")
+                return 201
+
+    return status_code
+
+
+def add_colister_record(mls_number, agent):
+    """Resolve the co-lister's contact and link it to the listing; returns the status that ended it"""
+    colister, status_code = contact_resolver.resolve_contact(agent)
+    log("resolve_contact colister")
+    if status_code not in (200, 201):
+        return status_code
+    new_colister, status_code = add_colister(mls_number=mls_number, colister_id=colister["id"])
+    log("add_colister")
+    return status_code
+
+
+def insert_listing(listing, agents, known=None):
+    """check_listing, then add_listing_records for a new one; returns the status that ended the chain"""
+    status_code = check_listing(listing["mls_number"], known)
+    if status_code == 200 or status_code in RETRY_STATUS_CODES:
+        return status_code
+    return add_listing_records(listing, agents)
+
+
+def store_listing(listing, agents, known=None, checked=False):
+    """
+    insert_listing, journaling it if the server is unreachable; returns the outcome for the manifest.
+    checked: check_listing already found the listing new, so only the records are added.
+    """
+    status_code = add_listing_records(listing, agents) if checked else insert_listing(listing, agents, known)
+    if checked and status_code not in (200, 201) and status_code not in RETRY_STATUS_CODES:
+        # the bulk MLS set only holds listings GET /listings returns (it filters by status), so a
+        # listing it called new may be there after all: the add then fails, get_listing knows
+        found_listing, found_status = get_listing(listing["mls_number"])
+        if found_status == 200:
+            log(f"Listing exists: {listing["mls_number"]} (not in the bulk MLS set)")
+            status_code = 200
+    if status_code in RETRY_STATUS_CODES:
+        # server unreachable - keep the parsed listing so it's added on replay instead of rescraped
+        journal, status_code = journal_write("new_listing", {"listing": listing, "agents": agents})
+        if status_code == 202:
+            log(f"📓 Journaled {listing["mls_number"]} for replay")
+            return "journaled"
+
+    if status_code == 201:
+        return "added"
+    if status_code == 200:
+        return "exists"
+    return "failed"
 
 
-def process_page(file_name):
+def new_listing(listing, agents):
+    log(f"new_listing: {listing["mls_number"]}")
+    return store_listing(listing, agents) in ("added", "journaled")
+
+
+def replay_new_listing(payload):
+    """
+    Journal replay handler. An existing listing counts as done, unless the journaled run had
+    already sent the listing itself (lister_id is set): then that POST landed and the co-lister
+    step after it never ran, so it's finished here.
+    """
+    listing, agents = payload["listing"], payload["agents"]
+    log(f"replay new_listing: {listing["mls_number"]}")
+    status_code = insert_listing(listing, agents)
+    if status_code == 200 and "lister_id" in listing and len(agents) > 1:
+        status_code = add_colister_record(listing["mls_number"], agents[1])
+    return listing["mls_number"], status_code
+
+
+def replay_colister(payload):
+    """Journal replay handler for a co-lister whose listing was already added"""
+    log(f"replay colister: {payload["mls_number"]}")
+    return payload["mls_number"], add_colister_record(payload["mls_number"], payload["agent"])
+
+
+register_replay("new_listing", replay_new_listing)
+register_replay("colister", replay_colister)
+
+
+def parse_file(file_path):
+    """Parse stage: (listing, agents) or None. Top-level so the process pool can run it."""
+    if PAGE_FAST_PATH:
+        regions = page_extract.extract_regions(file_path)
+        if regions is not None:
+            return details_from_regions(regions)
+        log(f"↩️ Fast path couldn't read {os.path.basename(file_path)}, using the full parser")
+    with open(file_path, encoding="utf-8") as f:
+        return get_details(f.read())
+
+
+def check_manifest(file_path):
+    """
+    Fingerprint a page and look it up in the current server's manifest: returns (fingerprint,
+    known, changed). known is the manifest entry when these exact bytes already reached a final outcome;
+    changed is True when the same canonical URL was ingested before with different content.
+    """
+    if not INGEST_MANIFEST:
+        return None, None, False
+    content_hash, canonical_url = ingest_manifest.fingerprint(file_path)
+    server = current_server()
+    known = ingest_manifest.lookup(server, content_hash)
+    if known and known["outcome"] in ingest_manifest.FINAL_OUTCOMES:
+        ingest_manifest.touch(server, content_hash)
+        return (content_hash, canonical_url), known, False
+    previous = ingest_manifest.previous_version(server, canonical_url, content_hash)
+    if previous:
+        log(f"🔁 Page changed since last ingest (MLS {previous['mls_number']}), re-ingesting: {canonical_url}")
+    return (content_hash, canonical_url), None, previous is not None
+
+
+def _record(fingerprint, file_name, mls_number, outcome):
+    if fingerprint:
+        ingest_manifest.record(current_server(), fingerprint[0], fingerprint[1], file_name, mls_number, outcome)
+
+
+# ---- ingest pipeline: scan -> read -> parse -> dedupe -> upload -> disposition ----
+
+def scan_pages(folder):
+    """Pipeline source: one item per file in folder, listed lazily so memory stays flat"""
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield {"file_name": entry.name, "path": entry.path, "fingerprint": None}
+
+
+def read_stage(item):
+    """Fingerprint the page; pages whose exact bytes the manifest has seen are done here"""
     try:
-        file_path = Path(PAGES_FOLDER) / file_name
-        with open(file_path, encoding="utf-8") as f:
-            html_data = f.read()
-            result = get_details(html_data)
-
-            if not result:
-                log(f"❌ Skipping file {file_name} due to missing details.")
-                return False
-
-            listing, agents = result
-            if new_listing(listing, agents):
-                log(f"✅ process_page: {file_name} success")
-                return True
-
-    except FileNotFoundError:
-        log(f"❌ File not found: {file_name}")
-    except Exception as e:
-        log(f"❌ Unexpected error processing {file_name}: {e}")
+        fingerprint, known, changed = check_manifest(item["path"])
+    except OSError as e:
+        log(f"❌ Manifest check failed for {item["file_name"]}: {e}")
+        fingerprint, known, changed = None, None, False
+    item.update(fingerprint=fingerprint, changed=changed)
+    if known:
+        log(f"⏭️ Already ingested ({known['outcome']}, MLS {known['mls_number']}): {item["file_name"]}")
+        item.update(done=True, success=False, skipped=True, mls_number=known["mls_number"], outcome=known["outcome"])
+    return item
+
+
+def parse_stage(pool=None):
+    """Parse in the process pool if there is one (the stage's threads just wait on it)"""
+    def parse(item):
+        try:
+            item["result"] = pool.submit(parse_file, item["path"]).result() if pool else parse_file(item["path"])
+        except FileNotFoundError:
+            log(f"❌ File not found: {item["file_name"]}")
+            item.update(done=True, success=False)
+            return item
+        if not item["result"]:
+            log(f"❌ Skipping file {item["file_name"]} due to missing details.")
+            _record(item["fingerprint"], item["file_name"], None, "unparseable")
+            item.update(done=True, success=False, outcome="unparseable")
+        return item
+    return parse
+
+
+def dedupe_stage(bulk_check=True):
+    """
+    Drop listings the server already has. The known MLS numbers are fetched on the first page
+    that gets here, so a run where the manifest skipped everything makes no call.
+    """
+    lock = threading.Lock()
+    state = {}
+
+    def dedupe(item):
+        with lock:
+            if "known" not in state:
+                state["known"] = fetch_known_mls_numbers() if bulk_check else None
+                if state["known"] is not None:
+                    log(f"🔎 {len(state['known'])} MLS numbers already on the server")
+        listing = item["result"][0]
+        status_code = check_listing(listing["mls_number"], state["known"])
+        if status_code == 200:
+            _record(item["fingerprint"], item["file_name"], listing["mls_number"], "exists")
+            item.update(done=True, success=False, outcome="exists")
+        # a lookup that failed for lack of a server is left to the upload stage to retry or journal
+        item["checked"] = status_code != 200 and status_code not in RETRY_STATUS_CODES
+        item["known"] = state["known"]
+        return item
+    return dedupe
+
+
+def upload_stage(item):
+    listing, agents = item["result"]
+    log(f"new_listing: {listing["mls_number"]}")
+    outcome = store_listing(listing, agents, checked=item["checked"])
+    _record(item["fingerprint"], item["file_name"], listing["mls_number"], outcome)
+    if outcome == "failed":
+        _release_mls(item.get("known"), listing["mls_number"])
+    item["outcome"] = outcome
+    item["success"] = outcome in ("added", "journaled")
+    if item["success"]:
+        log(f"✅ process_page: {item["file_name"]} success")
+    return item
+
+
+def disposition_stage(outcomes):
+    """
+    Count every page's outcome and file the ones that didn't go in this time: pages whose listing
+    is on the server ("added" or "exists", including pages the manifest skipped) to processed,
+    the rest to failed. Pages that just went in stay where they are.
+    """
+    def dispose(item):
+        if item.get("error"):
+            log(f"❌ Unexpected error processing {item["file_name"]}: {item["error"]}")
+        outcomes["changed"] += bool(item.get("changed"))
+        if item.get("skipped"):
+            outcomes["skipped"] += 1
+        elif item.get("success"):
+            outcomes["succeeded"] += 1
+        else:
+            outcomes["failed"] += 1
+        if not item.get("success"):
+            listing = (item.get("result") or (None,))[0]
+            mls_number = listing["mls_number"] if listing else item.get("mls_number")
+            move = move_to_processed if item.get("outcome") in ("added", "exists") else move_to_failed
+            move(item["file_name"], mls_number, os.path.dirname(item["path"]))
+        return item
+    return dispose
+
+
+def ingest_stages(outcomes, parse_workers=1, api_workers=1, pool=None, bulk_check=True):
+    """The process_pages stages; the API-bound ones get api_workers threads"""
+    return [
+        Stage("read", read_stage),
+        Stage("parse", parse_stage(pool), workers=parse_workers),
+        Stage("dedupe", dedupe_stage(bulk_check), workers=1 if bulk_check else api_workers),
+        Stage("upload", upload_stage, workers=api_workers),
+        Stage("disposition", disposition_stage(outcomes), always=True),
+    ]
 
-    return False
 
+def process_page(file_name):
+    """Run one page through the ingest stages; True if it was added or journaled"""
+    item = {"file_name": file_name, "path": os.path.join(PAGES_FOLDER, file_name), "fingerprint": None}
+    for stage in ingest_stages({}, bulk_check=False)[1:4]:
+        item = stage.process(item)
+    if item.get("error"):
+        log(f"❌ Unexpected error processing {file_name}: {item["error"]}")
+    return bool(item.get("success"))
+
+
+def page_stream(outcomes, folder=None):
+    """
+    The ingest stages for pages that arrive one at a time (the folder watcher): returns
+    (ingest, stages) where ingest(file_name) runs a page in folder (PAGES_FOLDER by default)
+    through read -> disposition on the calling thread and returns its item. Safe to call from
+    several threads.
+    """
+    stages = ingest_stages(outcomes, bulk_check=False)
+    lock = threading.Lock()
+
+    def ingest(file_name):
+        item = {"file_name": file_name, "path": os.path.join(folder or PAGES_FOLDER, file_name), "fingerprint": None}
+        for stage in stages[:-1]:
+            item = stage.process(item)
+        # disposition counts into outcomes, which the batch pipeline only ever touches from one thread
+        with lock:
+            return stages[-1].process(item)
+    return ingest, stages
+
+
+def process_pages(parse_workers=None, api_workers=None, on_progress=None):
+    """
+    Ingest every page in PAGES_FOLDER as a staged pipeline connected by bounded queues (see
+    services/pipeline.py): scan -> read (manifest) -> parse -> dedupe (known MLS numbers) ->
+    upload -> disposition. Pages that don't go in are moved to FAILED_FOLDER.
+    Parses in INGEST_PARSE_WORKERS processes and uploads in INGEST_API_WORKERS threads (both 1 =
+    one page at a time through every stage). on_progress(stages) gets the per-stage counters,
+    queue depths and time-in-stage while it runs. Returns a throughput summary.
+    """
+    parse_workers = parse_workers or INGEST_PARSE_WORKERS
+    api_workers = api_workers or INGEST_API_WORKERS
 
-def process_pages():
     page_count = count_filtered_pages(PAGES_FOLDER)
-    page_list = get_files_in_folder(PAGES_FOLDER)
-
     log(f"📄 Total pages to process: {page_count}")
 
-    for file_name in page_list:
-        success = process_page(file_name)
-        if not success:
-            move_to_failed(file_name)
+    started = time.perf_counter()
+    contact_resolver.reset_stats()
+    outcomes = {"succeeded": 0, "failed": 0, "skipped": 0, "changed": 0}
+    threaded = parse_workers > 1 or api_workers > 1
+
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(ProcessPoolExecutor(max_workers=parse_workers)) if parse_workers > 1 else None
+        pipeline = Pipeline(ingest_stages(outcomes, parse_workers, api_workers, pool, INGEST_BULK_CHECK),
+                            source_name="scan")
+        stages = pipeline.run(scan_pages(PAGES_FOLDER), threaded=threaded, on_progress=on_progress)
+
+    pages = stages[0]["processed"]
+    seconds = time.perf_counter() - started
+    summary = {
+        "pages": pages,
+        "succeeded": outcomes["succeeded"],
+        "failed": outcomes["failed"],
+        "skipped": outcomes["skipped"],
+        "changed": outcomes["changed"],
+        "seconds": round(seconds, 2),
+        "pages_per_sec": round(pages / seconds, 1) if seconds else 0.0,
+        "parse_workers": parse_workers,
+        "api_workers": api_workers,
+        "contacts": dict(contact_resolver.stats),
+        "stages": stages,
+    }
+    log(f"📊 process_pages: {summary['succeeded']}/{summary['pages']} succeeded, {summary['skipped']} already "
+        f"ingested, {summary['changed']} changed in {summary['seconds']}s ({summary['pages_per_sec']} pages/sec, "
+        f"{parse_workers} parse / {api_workers} API workers)")
+    for stage in stages:
+        log(f"⏱️ {stage['stage']}: {stage['processed']} pages, {stage['avg_ms']} ms avg, "
+            f"{round(stage['utilization'] * 100)}% busy x{stage['workers']}, max queue {stage['max_queue']}")
+    log(f"👥 Contacts: {summary['contacts']['hits']} cached, {summary['contacts']['lookups']} looked up, "
+        f"{summary['contacts']['added']} added, {summary['contacts']['uncached']} without email")
+    return summary
 
 
 if __name__ == "__main__":
@@ -2,8 +2,7 @@ import os
 import shutil
 import time
 import re
-from bs4 import BeautifulSoup
-from datetime import datetime
+from services import backup_store, page_extract
 
 # Folder containing the HTML files
 PAGES_FOLDER = r"C:/LOCAL_PROJECTS/RRR_LOGS/pages"
@@ -12,18 +11,12 @@ BACKUP_ROOT =os.path.expanduser("~/Downloads/backups")
 
 
 def backup_pages_folder(source_folder, backup_root):
-    # Create timestamp suffix
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_folder = os.path.join(backup_root, f"pages_{timestamp}")
-    
-    # Create backup directory
-    os.makedirs(backup_folder, exist_ok=True)
-    
-    # Copy all contents of pages folder into the timestamped backup
-    shutil.copytree(source_folder, backup_folder, dirs_exist_ok=True)
-    
-    print(f"✅ Backup completed: {backup_folder}")
-    return backup_folder
+    """Incremental backup: only new content is stored, the backup itself is a manifest (see backup_store)"""
+    manifest_path, stats = backup_store.backup_folder(source_folder, backup_root)
+
+    print(f"✅ Backup completed: {manifest_path} ({stats['files']} files, {stats['new_blobs']} new, "
+          f"{stats['bytes_stored'] / 1024:.0f} KB stored)")
+    return manifest_path
 
 
 def copy_pages():
@@ -54,13 +47,111 @@ def count_filtered_pages(folder):
     return count
 
 
+def _is_page(file_name):
+    return file_name.lower().endswith((".html", ".htm"))
+
+
+def is_download_page(file_name):
+    """Downloads that get placed in PAGES_FOLDER: .html only, as copy_pages always took"""
+    return file_name.endswith(".html")
+
+
+def place_page(path, file_name, pages_folder, taken=None):
+    """
+    Copy one downloaded page to pages_folder under its final property_... name.
+    taken: names already in pages_folder (updated here); None checks the folder itself.
+    Returns (outcome, new file name or None); outcome is copied, conflict, no_canonical or unexpected_url
+    """
+    canonical_url = page_extract.canonical_url(path)
+    if canonical_url is None:
+        new_file_name, outcome = None, "no_canonical"
+    else:
+        new_file_name = page_file_name(canonical_url)
+        outcome = "unexpected_url" if new_file_name is None else None
+    if new_file_name is None:
+        if not file_name.lower().startswith("property"):
+            return outcome, None
+        # already named like a property page: kept under its own name
+        new_file_name = file_name
+
+    new_file_path = os.path.join(pages_folder, new_file_name)
+    exists = new_file_name in taken if taken is not None else os.path.exists(new_file_path)
+    if exists and new_file_name != file_name:
+        return "conflict", new_file_name
+
+    shutil.copy2(path, new_file_path)
+    if taken is not None:
+        taken.add(new_file_name)
+    return "copied", new_file_name
+
+
+def ingest_downloads(source_folder=None, pages_folder=None, backup_root=None):
+    """
+    Single pass over the downloads: back up each file, read its canonical link and write the
+    page straight to pages_folder under its final property_... name. One scandir of pages_folder
+    up front clears what remove_non_property_files would delete and tells which names are taken.
+    Returns {'files': {name: outcome}, 'outcomes': {outcome: count}, 'page_count', 'backup'};
+    outcomes: copied, conflict, no_canonical, unexpected_url, not_html, error
+    """
+    source_folder = source_folder or SOURCE_FOLDER
+    pages_folder = pages_folder or PAGES_FOLDER
+    backup_root = backup_root or BACKUP_ROOT
+    os.makedirs(pages_folder, exist_ok=True)
+    taken = set()
+    with os.scandir(pages_folder) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if not entry.name.lower().startswith("property"):
+                print(f"Deleting: {entry.name}")
+                os.remove(entry.path)
+            elif _is_page(entry.name):
+                taken.add(entry.name)
+    ready = len(taken)
+
+    backup = backup_store.Backup(source_folder, backup_root)
+    files = {}
+    with os.scandir(source_folder) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.is_dir():
+                # downloads are flat; anything nested is still backed up, as the old copytree did
+                for folder, _, file_names in os.walk(entry.path):
+                    for file_name in file_names:
+                        backup.add(os.path.join(folder, file_name))
+                continue
+            if not entry.is_file():
+                continue
+            try:
+                backup.add(entry.path, entry.name, entry.stat())
+                if not is_download_page(entry.name):
+                    files[entry.name] = "not_html"
+                    continue
+
+                before = len(taken)
+                files[entry.name], _ = place_page(entry.path, entry.name, pages_folder, taken)
+                ready += len(taken) - before
+            except PermissionError as e:
+                print(f"PermissionError on {entry.name}: {e}. File may be open in another program.")
+                files[entry.name] = "error"
+            except Exception as e:
+                print(f"Error processing {entry.name}: {e}")
+                files[entry.name] = "error"
+
+    outcomes = {}
+    for outcome in files.values():
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return {"files": files, "outcomes": outcomes, "page_count": ready, "backup": backup.commit()}
+
+
 def do_scrape_listings():
-    backup_pages_folder(SOURCE_FOLDER, BACKUP_ROOT)
-    copy_pages()
-    rename_files_in_folder(PAGES_FOLDER)
-    remove_non_property_files(PAGES_FOLDER)
-    page_count = count_filtered_pages(PAGES_FOLDER)
-    return page_count
+    report = ingest_downloads()
+    for file_name, outcome in report["files"].items():
+        if outcome != "copied":
+            print(f"Skipped {file_name} ({outcome})")
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(report["outcomes"].items()))
+    print(f"✅ Backup completed: {report['backup']}")
+    print(f"📄 {report['page_count']} filtered files found in: {PAGES_FOLDER} ({summary or 'no downloads'})")
+    return report["page_count"]
 
 
 def remove_files_in_directory(directory_path):
@@ -87,6 +178,14 @@ def remove_non_property_files(folder):
             os.remove(file_path)
 
 
+def page_file_name(canonical_url):
+    """property_<slug>.html for a homes.com property URL, None for anything else"""
+    if not canonical_url.startswith("https://www.homes.com/property/"):
+        return None
+    slug = canonical_url.replace("https://www.homes.com/property/", "property_").strip("/")
+    return slug.replace("/", "_") + ".html"
+
+
 def rename_files_in_folder(folder):
     for file_name in os.listdir(folder):
         file_path = os.path.join(folder, file_name)
@@ -94,21 +193,16 @@ def rename_files_in_folder(folder):
             continue
 
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                soup = BeautifulSoup(f, "html.parser")
-
-            canonical_tag = soup.find("link", rel="canonical")
-            if not canonical_tag or not canonical_tag.has_attr("href"):
+            canonical_url = page_extract.canonical_url(file_path)
+            if canonical_url is None:
                 print(f"Skipping {file_name} (no canonical link)")
                 continue
 
-            canonical_url = canonical_tag["href"]
-            if not canonical_url.startswith("https://www.homes.com/property/"):
+            new_file_name = page_file_name(canonical_url)
+            if new_file_name is None:
                 print(f"Skipping {file_name} (unexpected URL format)")
                 continue
 
-            slug = canonical_url.replace("https://www.homes.com/property/", "property_").strip("/")
-            new_file_name = slug.replace("/", "_") + ".html"
             new_file_path = os.path.join(folder, new_file_name)
 
             if os.path.exists(new_file_path):
@@ -1,10 +1,11 @@
 import time
 from bs4 import BeautifulSoup
-from services.database_access import add_daily_price, get_quote_urls, set_server
+from services.database_access import daily_price_writer, get_quote_urls, set_server
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import re
 from decimal import Decimal
 from datetime import datetime, date
@@ -14,15 +15,22 @@ import platform
 from dotenv import load_dotenv
 from twilio.rest import Client
 import argparse
+import contextvars
+import queue
+import threading
 
 
 OS_RELEASE = platform.release()
 PRICING_ENGINE_URL = "https://www.loanfactorydirect.com/quote/qm?"
 debugging = False
-driver = None
 
+# Headless browsers do_all_pricing scrapes with in parallel (1 = one browser, as before), and the
+# pause each one takes after a page
+PRICING_WORKERS = int(os.getenv("PRICING_WORKERS", "1"))
+PRICING_PAGE_DELAY = float(os.getenv("PRICING_PAGE_DELAY", "3"))
 
-def do_all_pricing(z_list=None):
+
+def do_all_pricing(z_list=None, workers=None):
     county_names = { 90620: "Orange", 91901: "San Diego", 91708: "Riverside", 90001: "Los Angeles", 91319: 
                     "Ventura", 91701: "San Bernardino", 96701: "Honolulu", 96703: "Kauai", 96708: "Maui", 96704: "Hawaii"}
     if z_list == None:
@@ -31,33 +39,130 @@ def do_all_pricing(z_list=None):
     start = datetime.now()
     log(f"{start}  Start pricing")
     count = 0
-
-    for index, zipcode in enumerate(z_list):
-        try:
-            daily_prices_house = set_daily_prices(zipcode=zipcode, listing_type="house")
-            daily_prices_condo = set_daily_prices(zipcode=zipcode, listing_type="condo")
-            log(f"Daily Price for {county_names[zipcode]} county - House: {len(daily_prices_house)} Condo: {len(daily_prices_condo)}")
-            count += len(daily_prices_house)
-            count += len(daily_prices_condo)
-        except Exception as e:  # <-- Catch all errors
-            log(f"Exception do_all_pricing ({county_names[zipcode]} - {zipcode}): {e}")
-
-
-    if driver is not None:
-        try:
-            driver.quit()
-        except Exception as qe:
-            log(f"Error quitting driver: {qe}")
+    journaled = 0
+
+    jobs = pricing_jobs(z_list, county_names)
+    workers = max(1, min(workers or PRICING_WORKERS, len(jobs)))
+    log(f"Pricing {len(jobs)} quote pages with {workers} browsers")
+    priced = {}
+
+    # rows go to the batch writer in job order while the workers scrape the next pages
+    with daily_price_writer() as writer:
+        def collect(index, job, row):
+            if row is not None:
+                writer.add(row)
+                priced[job[:2]] = priced.get(job[:2], 0) + 1
+
+        run_pricing_pool(jobs, workers, collect)
+
+    for zipcode in z_list:
+        log(f"Daily Price for {county_names.get(zipcode, zipcode)} county - House: {priced.get((zipcode, 'house'), 0)} "
+            f"Condo: {priced.get((zipcode, 'condo'), 0)}")
+
+    for row, result, status_code in writer.results:
+        if status_code == 201:
+            count += 1
+        elif status_code == 202:
+            journaled += 1
+        else:
+            log(f"add_daily_price failed ({row.get('zipcode')} {row.get('listing_type')} {row.get('loan_type')}): {result}")
 
     finish = datetime.now()
     log(f"{finish}  Finish pricing")
     time_diff = finish - start
     minutes = int(time_diff.total_seconds() / 60)
     msg = f"Total records: {count} in {minutes} minutes"
+    if journaled:
+        msg += f" ({journaled} journaled for replay)"
     log(msg)
     return count, minutes
 
 
+def pricing_jobs(z_list, county_names=None):
+    """(zipcode, listing_type, quote url attributes) for every quote page, in the order they used to be scraped"""
+    jobs = []
+    for zipcode in z_list:
+        for listing_type in ("house", "condo"):
+            try:
+                quote_urls, status_code = get_quote_urls(zipcode=zipcode, listing_type=listing_type)
+            except Exception as e:
+                log(f"Exception do_all_pricing ({(county_names or {}).get(zipcode)} - {zipcode}): {e}")
+                continue
+            if status_code == 200:
+                jobs.extend((zipcode, listing_type, quote_url["attributes"]) for quote_url in quote_urls)
+    return jobs
+
+
+def scrape_job(driver, job):
+    """Scrape one (zipcode, listing_type, quote url) job; returns its daily_price row or None"""
+    zipcode, listing_type, qu = job
+    return scrape_price(driver, url=qu.get("url"), loan_amount=qu.get("loan_amount"), dp_factor=float(qu.get("dp_factor")),
+                        listing_type=listing_type, zipcode=zipcode, loan_type=qu.get("loan_type"))
+
+
+def run_pricing_pool(jobs, workers, on_result):
+    """
+    Scrape jobs with a pool of worker threads, each driving its own headless browser: started on
+    its first job, replaced after a browser error and quit when the queue is empty. A job that
+    fails is logged and gives None without affecting the others. on_result(index, job, row) is
+    called on the calling thread in job order as soon as the rows before it are in.
+    """
+    job_queue = queue.Queue()
+    for item in enumerate(jobs):
+        job_queue.put(item)
+    finished = queue.Queue()
+
+    def work(number):
+        worker_driver = None
+        try:
+            while True:
+                try:
+                    index, job = job_queue.get_nowait()
+                except queue.Empty:
+                    return
+                row = None
+                try:
+                    if worker_driver is None:
+                        worker_driver = start_selenium()
+                    row = scrape_job(worker_driver, job)
+                except Exception as e:
+                    log(f"Pricing worker {number} failed on {job[0]} {job[1]} {job[2].get('loan_type')}: {e}")
+                    if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+                        # the browser itself is in trouble: start a fresh one for the next job
+                        _quit(worker_driver)
+                        worker_driver = None
+                finally:
+                    finished.put((index, row))
+        finally:
+            _quit(worker_driver)
+
+    # each worker runs in a copy of the caller's context, so quote urls and rows use its API server
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(work, number),
+                                name=f"pricing-{number}", daemon=True) for number in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    rows = {}
+    next_index = 0
+    for _ in range(len(jobs)):
+        index, row = finished.get()
+        rows[index] = row
+        while next_index in rows:
+            on_result(next_index, jobs[next_index], rows.pop(next_index))
+            next_index += 1
+    for thread in threads:
+        thread.join()
+
+
+def _quit(worker_driver):
+    if worker_driver is None:
+        return
+    try:
+        worker_driver.quit()
+    except Exception as qe:
+        log(f"Error quitting driver: {qe}")
+
+
 def extract_monthly_mi(row) -> int:
     monthly_mi = 0
 
@@ -138,10 +243,12 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Run pricing scraper.")
     parser.add_argument('--env', choices=['local', 'remote'], default='remote', help='Which environment to use')
     parser.add_argument('--zips', type=str, help='Comma-separated list of ZIP codes, e.g. 92101,90001,90620')
+    parser.add_argument('--workers', type=int, default=PRICING_WORKERS, help='Headless browsers to scrape with in parallel')
     return parser.parse_args()
 
 
-def scrape_price(driver, url: str, loan_amount: int, dp_factor: float, listing_type: str, zipcode: int, loan_type: str) -> tuple:  
+def scrape_price(driver, url: str, loan_amount: int, dp_factor: float, listing_type: str, zipcode: int, loan_type: str) -> dict:
+    """The daily_price row for one quote page, or None without a usable quote; do_all_pricing writes it"""
     driver.get(url)
 
     # Wait for the first quote row to be present
@@ -149,7 +256,7 @@ def scrape_price(driver, url: str, loan_amount: int, dp_factor: float, listing_t
 
     # Now parse with BeautifulSoup
     soup = BeautifulSoup(driver.page_source, "html.parser")
-    time.sleep(3)
+    time.sleep(PRICING_PAGE_DELAY)
 
     pricing_data = get_pricing_engine_data(soup)
     best_quote = select_best_quote(pricing_data)
@@ -159,7 +266,7 @@ def scrape_price(driver, url: str, loan_amount: int, dp_factor: float, listing_t
         if debugging:
             with open(f"{loan_type}_{zipcode}.html", "w") as file:
                 file.write(str(soup))
-        return (0,0)
+        return None
     else:
          log(f"{listing_type}-{loan_type}-{loan_amount} best_quote: rate: {best_quote['rate']:.3f} points: {best_quote['points_credits']} lender: {best_quote['lender']}")
     
@@ -171,19 +278,18 @@ def scrape_price(driver, url: str, loan_amount: int, dp_factor: float, listing_t
 
     best_quote["mi_factor"] = mi_factor
 
-    # add the daily_price to db
-    new_daily_price, status_code = add_daily_price(listing_type=listing_type, 
-                                                   zipcode=zipcode, 
-                                                   loan_type=loan_type, 
-                                                   loan_amount=loan_amount, 
-                                                   dp_factor=dp_factor,
-                                                   rate=best_quote.get("rate"), 
-                                                   apr=best_quote.get("apr"), 
-                                                   points_credits=best_quote.get("points_credits"), 
-                                                   lender=best_quote.get("lender"), 
-                                                   mi_factor=mi_factor)
-    
-    return new_daily_price, status_code
+    daily_price = {"listing_type": listing_type,
+                   "zipcode": zipcode,
+                   "loan_type": loan_type,
+                   "loan_amount": loan_amount,
+                   "dp_factor": dp_factor,
+                   "rate": best_quote.get("rate"),
+                   "apr": best_quote.get("apr"),
+                   "points_credits": best_quote.get("points_credits"),
+                   "lender": best_quote.get("lender"),
+                   "mi_factor": mi_factor}
+
+    return daily_price
 
 
 def select_best_quote(pricing_data) -> dict:
@@ -236,41 +342,6 @@ def select_best_quote_ai(pricing_data) -> dict:
     return best_choices[0] if best_choices else None
 
 
-def set_daily_prices(zipcode=0, listing_type="") -> list:
-    global driver
-    daily_prices=[]
-    programs = {
-        "conventional-20": {"dp_factor": 0.2 },
-        "conventional-5": {"dp_factor": 0.05 },
-        "high balance-20": {"dp_factor": 0.2 },
-        "high balance-5": {"dp_factor": 0.05 },
-        "fha": {"dp_factor": 0.035 },
-        "va": {"dp_factor": 0.0 },
-        "jumbo": {"dp_factor": 0.2 }
-    }
-
-    if driver == None:
-        driver = start_selenium()
-
-    quote_urls, status_code = get_quote_urls(zipcode=zipcode, listing_type=listing_type)
-
-    if status_code == 200:
-        for quote_url in quote_urls:
-            qu = quote_url["attributes"]
-            loan_type = qu.get("loan_type")
-            url = qu.get("url")
-            loan_amount = qu.get("loan_amount")
-            dp_factor = float(qu.get("dp_factor"))
-
-            price_data, status = scrape_price(driver, url=url, loan_amount=loan_amount, dp_factor=dp_factor, 
-                                            listing_type=listing_type, zipcode=zipcode, loan_type=loan_type)
-
-            if status == 201:
-                daily_prices.append(price_data)
-        
-    return daily_prices
-
-
 def start_selenium():
     # from selenium.webdriver.firefox.options import Options
 
@@ -327,7 +398,7 @@ def main():
         z_list = [int(z.strip()) for z in args.zips.split(",")]
 
     print(z_list)
-    do_all_pricing(z_list)
+    do_all_pricing(z_list, workers=args.workers)
 
 
 if __name__ == "__main__":
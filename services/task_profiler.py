@@ -0,0 +1,190 @@
+"""
+Profiling for workflow tasks
+profile_call runs a task under cProfile (deterministic, the calling thread only) or a sampling
+profiler (wall clock, every thread the task starts, e.g. the process_pages pipeline) and stores
+the result per run in PROFILE_FOLDER/<run_id>/:
+    <task>.json    summary with the hottest functions (what the workflows page shows)
+    <task>.prof    pstats dump (cProfile), open with `python -m pstats` or snakeviz
+    <task>.folded  collapsed stacks (sampling), for flamegraph.pl / speedscope
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_FOLDER = os.getenv("PROFILE_FOLDER", os.path.join("..", "RRR_LOGS", "profiles"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_TOP = 200
+MODES = ("cprofile", "sample")
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def new_run_id(name):
+    """Folder name for one profiled run (a workflow or a single task)"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{_SAFE_NAME.sub('_', name)}"
+
+
+def run_folder(run_id):
+    """Path of a run's folder; run ids from a URL are reduced to safe characters first"""
+    return os.path.join(PROFILE_FOLDER, _SAFE_NAME.sub("_", run_id))
+
+
+def _function_name(file_name, line, name):
+    if file_name == "~":
+        # C function as reported by cProfile, e.g. <built-in method time.sleep>
+        return name
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+class Sampler:
+    """Samples the stacks of the threads a task starts (and the one it runs on) at a fixed interval"""
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.own = Counter()
+        self.total = Counter()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._ignore = set()
+
+    def start(self, thread_id):
+        # threads that were already running (the web server, other requests) aren't the task's
+        self._ignore = {ident for ident in sys._current_frames() if ident != thread_id}
+        self._thread = threading.Thread(target=self._run, name="task-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_thread = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_thread or ident in self._ignore:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_function_name(code.co_filename, code.co_firstlineno, code.co_qualname))
+                    frame = frame.f_back
+                self.samples += 1
+                self.own[stack[0]] += 1
+                self.total.update(set(stack))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def rows(self):
+        seconds = self.interval
+        return [{"function": name, "calls": None, "own_seconds": round(self.own[name] * seconds, 4),
+                 "total_seconds": round(count * seconds, 4), "own_samples": self.own[name], "samples": count}
+                for name, count in self.total.items()]
+
+
+def _cprofile_rows(profile):
+    stats = pstats.Stats(profile)
+    return [{"function": _function_name(file_name, line, name), "calls": calls,
+             "own_seconds": round(own, 4), "total_seconds": round(total, 4)}
+            for (file_name, line, name), (_, calls, own, total, _) in stats.stats.items()]
+
+
+def _keep_top(rows, top=PROFILE_TOP):
+    """The top functions by own time plus the top by total time"""
+    by_own = sorted(rows, key=lambda row: row["own_seconds"], reverse=True)[:top]
+    by_total = sorted(rows, key=lambda row: row["total_seconds"], reverse=True)[:top]
+    kept = {row["function"]: row for row in by_own + by_total}
+    return sorted(kept.values(), key=lambda row: row["own_seconds"], reverse=True)
+
+
+def profile_call(run_id, task_name, func, *args, mode=None, **kwargs):
+    """Call func(*args, **kwargs) under the profiler and save the profile; returns func's result"""
+    mode = mode if mode in MODES else PROFILE_MODE
+    folder = run_folder(run_id)
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, _SAFE_NAME.sub("_", task_name))
+
+    started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    started = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # only one cProfile can be active per interpreter (another task is being profiled)
+            mode = "sample"
+    if mode == "sample":
+        profiler = Sampler()
+        profiler.start(threading.get_ident())
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+        seconds = time.perf_counter() - started
+
+        if mode == "cprofile":
+            profiler.dump_stats(base + ".prof")
+            rows, raw_file = _cprofile_rows(profiler), os.path.basename(base) + ".prof"
+        else:
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in profiler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            rows, raw_file = profiler.rows(), os.path.basename(base) + ".folded"
+
+        summary = {
+            "run_id": os.path.basename(folder),
+            "task": task_name,
+            "mode": mode,
+            "started_at": started_at,
+            "seconds": round(seconds, 3),
+            "raw_file": raw_file,
+            "functions": _keep_top(rows),
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+
+
+def list_runs(limit=20):
+    """Newest profiled runs: [{'run_id', 'tasks': [{'task', 'mode', 'seconds', 'file'}]}]"""
+    if not os.path.isdir(PROFILE_FOLDER):
+        return []
+    runs = []
+    for run_id in sorted(os.listdir(PROFILE_FOLDER), reverse=True)[:limit]:
+        folder = os.path.join(PROFILE_FOLDER, run_id)
+        if not os.path.isdir(folder):
+            continue
+        tasks = []
+        for file_name in sorted(os.listdir(folder), key=lambda name: os.path.getmtime(os.path.join(folder, name))):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                summary = load_summary(run_id, file_name[:-5])
+            except (OSError, ValueError):
+                continue
+            tasks.append({"task": summary["task"], "mode": summary["mode"], "seconds": summary["seconds"],
+                          "file": file_name[:-5], "raw_file": summary["raw_file"]})
+        runs.append({"run_id": run_id, "tasks": tasks})
+    return runs
+
+
+def load_summary(run_id, task_file):
+    with open(os.path.join(run_folder(run_id), _SAFE_NAME.sub("_", task_file) + ".json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def top_functions(summary, sort="own_seconds", limit=30):
+    """The summary's hottest functions by own_seconds or total_seconds"""
+    key = sort if sort in ("own_seconds", "total_seconds") else "own_seconds"
+    return sorted(summary["functions"], key=lambda row: row[key], reverse=True)[:limit]
@@ -4,13 +4,15 @@ Runs multi-step workflows like the TKinter app
 """
 
 from services import database_access as api
-from services import process_listings, scrape_homes, scrape_pricing, dscr_pricing
+from services import process_listings, scrape_homes, scrape_pricing, dscr_pricing, task_profiler, page_watcher
 from services.my_logger import log
 from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
+import os
 import time
 import threading
+import contextvars
 
 # Global workflow status
 workflow_status = {
@@ -19,11 +21,19 @@ workflow_status = {
     'progress': [],
     'errors': [],
     'started_at': None,
-    'completed_at': None
+    'completed_at': None,
+    'server': None,
+    'profile_run': None
 }
 
 EXPORT_ROOT = Path("C:/LOCAL_PROJECTS/RateReadyRealtor/RRR_LOGS/archive")
 
+# Pause between email batches (seconds); the benchmarks set this to 0
+EMAIL_BATCH_DELAY = float(os.getenv("EMAIL_BATCH_DELAY", "2"))
+
+# Profile every workflow task by default (the workflows page can also switch it on per session)
+WORKFLOW_PROFILE = os.getenv("WORKFLOW_PROFILE", "0") == "1"
+
 
 def update_status(task_name, message, error=False):
     """Update workflow status"""
@@ -48,6 +58,57 @@ def get_workflow_status():
     return workflow_status.copy()
 
 
+# Streaming ingest of new downloads (see services/page_watcher.py); None while not watching
+watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_watcher():
+    """Start streaming new downloads into the database; keeps the caller's API server"""
+    global watcher
+    with _watcher_lock:
+        if watcher is not None and watcher.running:
+            return False
+        watcher = page_watcher.PageWatcher()
+        watcher.start()
+        return True
+
+
+def stop_watcher():
+    with _watcher_lock:
+        if watcher is None or not watcher.running:
+            return False
+        watcher.stop()
+        return True
+
+
+def get_watcher_status():
+    return watcher.status() if watcher is not None else {'running': False}
+
+
+def do_replay_journal():
+    """Resend writes that were journaled while RRR_Server was unreachable"""
+    pending = api.get_journal_counts()["pending"]
+    if not pending:
+        return True
+
+    update_status("do_replay_journal", f"Replaying {pending} journaled writes...")
+    try:
+        def progress(done, total):
+            if done % 25 == 0 or done == total:
+                update_status("do_replay_journal", f"Replayed {done}/{total}")
+
+        summary = api.replay_journal(progress=progress)
+        update_status("do_replay_journal",
+                      f"Journal replay: {summary['replayed']} replayed, {summary['failed']} rejected, "
+                      f"{summary['pending']} still pending",
+                      error=bool(summary['failed'] or summary['pending']))
+        return not summary['pending']
+    except Exception as e:
+        update_status("do_replay_journal", f"Error: {str(e)}", error=True)
+        return False
+
+
 def do_pricing():
     """Scrape mortgage pricing from LoanFactory"""
     update_status("do_pricing", "Starting pricing scrape...")
@@ -72,12 +133,20 @@ def do_scrape():
         return False
 
 
+def _pipeline_progress(stages):
+    """process_pages progress callback: per-stage counters for the status panel"""
+    workflow_status['pipeline'] = stages
+
+
 def do_process_pages():
     """Process HTML listings"""
     update_status("do_process_pages", "Processing listing HTML files...")
     try:
-        result = process_listings.process_pages()
-        update_status("do_process_pages", f"Processed listings: {result}")
+        result = process_listings.process_pages(on_progress=_pipeline_progress)
+        update_status("do_process_pages", f"Processed listings: {result['succeeded']}/{result['pages']} succeeded, "
+                                          f"{result['failed']} failed ({result['skipped']} already ingested, "
+                                          f"{result['changed']} changed) in {result['seconds']}s "
+                                          f"({result['pages_per_sec']} pages/sec)")
         return True
     except Exception as e:
         update_status("do_process_pages", f"Error: {str(e)}", error=True)
@@ -213,20 +282,40 @@ def send_email_batches(debug=False, dscr=False, batch_size=25):
                 break
 
             batch_num += 1
-            time.sleep(2)  # Delay between batches
+            time.sleep(EMAIL_BATCH_DELAY)  # Delay between batches
         else:
             break
 
     return total_sent
 
 
-def run_workflow(workflow, **kwargs):
+def run_task(task_func, *args, profile=False, run_id=None):
+    """
+    Call a task, under task_profiler when profile (or WORKFLOW_PROFILE) is set.
+    run_id groups the profiles of one workflow run; a lone task gets a run of its own.
+    """
+    if not (profile or WORKFLOW_PROFILE):
+        return task_func(*args)
+    task_name = task_func.__name__
+    run_id = run_id or task_profiler.new_run_id(task_name)
+    try:
+        return task_profiler.profile_call(run_id, task_name, task_func, *args)
+    finally:
+        workflow_status['profile_run'] = run_id
+        log(f"🔬 Profile of {task_name} saved to run {run_id}")
+
+
+def run_workflow(workflow, profile=False, **kwargs):
     """
     Run a workflow in the background
     workflow: list of task functions to run sequentially
+    profile: profile each task (see run_task); the profiles of the run are stored together
     kwargs: parameters like listing_status, debug
+    The thread runs in a copy of the caller's context, so it keeps the API server
+    that was bound for the request that started it.
     """
     global workflow_status
+    run_id = task_profiler.new_run_id("workflow") if profile or WORKFLOW_PROFILE else None
 
     def _run():
         global workflow_status
@@ -236,21 +325,27 @@ def run_workflow(workflow, **kwargs):
             'progress': [],
             'errors': [],
             'started_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'completed_at': None
+            'completed_at': None,
+            'server': api.current_server(),
+            'profile_run': run_id
         }
 
         update_status("workflow", f"Starting workflow with {len(workflow)} tasks")
 
+        # catch up on writes journaled during an earlier outage before adding new ones
+        do_replay_journal()
+
         for task_func in workflow:
             task_name = task_func.__name__
             try:
                 # Call task with appropriate parameters
                 if task_name in ['do_quote', 'do_dscr_quote']:
-                    result = task_func(kwargs.get('listing_status', 'new'))
+                    args = (kwargs.get('listing_status', 'new'),)
                 elif task_name in ['do_email', 'do_dscr_email']:
-                    result = task_func(kwargs.get('debug', False))
+                    args = (kwargs.get('debug', False),)
                 else:
-                    result = task_func()
+                    args = ()
+                result = run_task(task_func, *args, profile=run_id is not None, run_id=run_id)
 
                 if not result:
                     update_status(task_name, "Task returned False - continuing anyway", error=True)
@@ -263,8 +358,9 @@ def run_workflow(workflow, **kwargs):
         workflow_status['current_task'] = None
         update_status("workflow", "Workflow completed")
 
-    # Run in background thread
-    thread = threading.Thread(target=_run, daemon=True)
+    # Run in background thread, carrying the caller's server binding
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(_run,), daemon=True)
     thread.start()
 
     return True
@@ -0,0 +1,107 @@
+"""
+Durable local journal of API writes that couldn't reach RRR_Server
+database_access appends an entry when a write fails because the server is unreachable and
+replay_journal() resends the pending entries, oldest first, once it is back.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+JOURNAL_PATH = os.getenv("API_JOURNAL_PATH", os.path.join("..", "RRR_LOGS", "api_journal.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    server TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_pending ON journal (server, state, id);
+"""
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _connection():
+    """Open the journal on first use (WAL, so an append is one sequential write)"""
+    global _conn
+    if _conn is None:
+        folder = os.path.dirname(JOURNAL_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        _conn = sqlite3.connect(JOURNAL_PATH, check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(SCHEMA)
+    return _conn
+
+
+def append(server, kind, payload, idempotency_key):
+    """Record a write; committed before returning so it survives a crash of the admin"""
+    with _lock:
+        conn = _connection()
+        cursor = conn.execute(
+            "INSERT INTO journal (created_at, server, kind, payload, idempotency_key) VALUES (?, ?, ?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), server, kind, json.dumps(payload, default=str),
+             idempotency_key))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def pending(server):
+    """Pending entries for a server in the order they were written"""
+    with _lock:
+        rows = _connection().execute(
+            "SELECT * FROM journal WHERE server = ? AND state = 'pending' ORDER BY id", (server,)).fetchall()
+    return [dict(row, payload=json.loads(row["payload"])) for row in rows]
+
+
+def _update(entry_id, state, error=None):
+    with _lock:
+        conn = _connection()
+        conn.execute("UPDATE journal SET state = ?, attempts = attempts + 1, last_error = ? WHERE id = ?",
+                     (state, error, entry_id))
+        conn.commit()
+
+
+def mark_done(entry_id):
+    _update(entry_id, "done")
+
+
+def mark_failed(entry_id, error):
+    """The server answered but rejected the write; kept for inspection, never replayed again"""
+    _update(entry_id, "failed", error)
+
+
+def mark_retry(entry_id, error):
+    _update(entry_id, "pending", error)
+
+
+def counts(server=None):
+    """{'pending': n, 'failed': n, 'done': n} for one server, or all servers"""
+    sql, args = "SELECT state, COUNT(*) AS n FROM journal", ()
+    if server:
+        sql, args = sql + " WHERE server = ?", (server,)
+    with _lock:
+        rows = _connection().execute(sql + " GROUP BY state", args).fetchall()
+    result = {"pending": 0, "failed": 0, "done": 0}
+    result.update({row["state"]: row["n"] for row in rows})
+    return result
+
+
+def purge_done():
+    """Drop replayed entries"""
+    with _lock:
+        conn = _connection()
+        deleted = conn.execute("DELETE FROM journal WHERE state = 'done'").rowcount
+        conn.commit()
+    return deleted
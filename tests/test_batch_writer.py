@@ -0,0 +1,33 @@
+import time
+
+from services.database_access import BatchWriter
+
+
+def write(row):
+    if row["n"] % 2:
+        raise ValueError(f"bad row {row['n']}")
+    return {"id": row["n"]}, 201
+
+
+def test_rows_whose_write_raises_are_reported_as_failures():
+    writer = BatchWriter(write, batch_size=3, max_wait=60)
+    for n in range(5):
+        writer.add({"n": n})
+    results = writer.close()
+
+    assert [status for _, _, status in results] == [201, 500, 201, 500, 201]
+    assert [row["n"] for row, _, _ in writer.failures] == [1, 3]
+    assert writer.failures[0][1] == "bad row 1"
+
+
+def test_timed_flush_keeps_running_after_a_write_raises():
+    writer = BatchWriter(write, batch_size=100, max_wait=0.1)
+    writer.add({"n": 1})
+    time.sleep(1.5)
+    writer.add({"n": 2})
+    time.sleep(1.5)
+
+    # both rows went out on the timer, before close()
+    assert [status for _, _, status in writer.results] == [500, 201]
+    writer.close()
+    assert len(writer.results) == 2
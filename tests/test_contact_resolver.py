@@ -0,0 +1,60 @@
+import pytest
+
+from services import contact_resolver
+
+AGENT = {"first_name": "Ann", "last_name": "Lee", "company": "C", "phone": "1", "email_address": "Ann@Example.com",
+         "license": "123"}
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    """contact_resolver with an empty in-memory cache and recorded add_contact calls"""
+    monkeypatch.setattr(contact_resolver, "CONTACT_CACHE", True)
+    monkeypatch.setattr(contact_resolver, "CONTACT_CACHE_PATH", "")
+    monkeypatch.setattr(contact_resolver, "current_server", lambda: "http://server/api/")
+    contact_resolver.clear()
+    added = []
+
+    def add_contact(agent):
+        added.append(agent)
+        return {"id": 42}, 201
+
+    monkeypatch.setattr(contact_resolver, "add_contact", add_contact)
+    yield added
+    contact_resolver.clear()
+
+
+@pytest.mark.parametrize("reply", [
+    ([{"id": 1, "email_address": "someone@else.com"}], 200),
+    ({}, 200),
+    ({"id": 7, "email_address": "someone@else.com"}, 200),
+    ("Internal Server Error", 500),
+    ("Not found", 404),
+])
+def test_unusable_lookup_falls_through_to_add_contact(resolver, monkeypatch, reply):
+    monkeypatch.setattr(contact_resolver, "get_contact", lambda email_address=None: reply)
+
+    assert contact_resolver.resolve_contact(AGENT) == ({"id": 42}, 201)
+    assert resolver == [AGENT]
+
+
+def test_found_contact_is_cached(resolver, monkeypatch):
+    lookups = []
+
+    def get_contact(email_address=None):
+        lookups.append(email_address)
+        return {"id": 7, "email_address": "ann@example.com"}, 200
+
+    monkeypatch.setattr(contact_resolver, "get_contact", get_contact)
+
+    assert contact_resolver.resolve_contact(AGENT) == ({"id": 7}, 200)
+    assert contact_resolver.resolve_contact(AGENT) == ({"id": 7}, 200)
+    assert len(lookups) == 1
+    assert resolver == []
+
+
+def test_failed_add_contact_fails_the_agent(resolver, monkeypatch):
+    monkeypatch.setattr(contact_resolver, "get_contact", lambda email_address=None: ([], 200))
+    monkeypatch.setattr(contact_resolver, "add_contact", lambda agent: ("Connection Error", 503))
+
+    assert contact_resolver.resolve_contact(AGENT) == ("Connection Error", 503)
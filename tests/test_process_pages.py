@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from benchmarks import pages as synthetic_pages
+from benchmarks import stub_server
+from benchmarks.bench_client import scratch_ingest_state
+from services import database_access as api
+from services import process_listings
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """The RRR_Server stand-in as every API server, bound for this test"""
+    server, url = stub_server.serve()
+    for name in ("LOCAL_DB", "REMOTE_DB", "SERVER_DB"):
+        monkeypatch.setattr(api, name, url)
+    api.set_server("local")
+    api.clear_cache()
+    yield url
+    server.shutdown()
+    api.clear_server()
+
+
+@pytest.fixture
+def work(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_listings, "PAGE_ARCHIVE", False)
+    with scratch_ingest_state(str(tmp_path)):
+        yield tmp_path
+
+
+def _files(folder):
+    return sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+
+
+def test_second_run_moves_nothing_to_failed(stub, work):
+    synthetic_pages.write_pages(process_listings.PAGES_FOLDER, 5, seed=1)
+
+    first = process_listings.process_pages(parse_workers=1, api_workers=2)
+    assert first["succeeded"] == 5
+    assert _files(process_listings.FAILED_FOLDER) == []
+
+    second = process_listings.process_pages(parse_workers=1, api_workers=2)
+    assert second["skipped"] == 5
+    assert _files(process_listings.FAILED_FOLDER) == []
+    assert len(_files(process_listings.PROCESSED_FOLDER)) == 5
+
+
+def test_listing_missing_from_bulk_set_is_recorded_as_existing(stub, work, monkeypatch):
+    synthetic_pages.write_pages(process_listings.PAGES_FOLDER, 3, seed=2)
+    assert process_listings.process_pages(parse_workers=1, api_workers=1)["succeeded"] == 3
+
+    # same pages again with a fresh manifest, and a bulk set that (like GET /listings filtered
+    # by status) doesn't hold them
+    monkeypatch.setattr(process_listings, "INGEST_MANIFEST", False)
+    monkeypatch.setattr(process_listings, "fetch_known_mls_numbers", lambda: set())
+    summary = process_listings.process_pages(parse_workers=1, api_workers=1)
+
+    assert summary["succeeded"] == 0
+    assert _files(process_listings.FAILED_FOLDER) == []
+    assert len(_files(process_listings.PROCESSED_FOLDER)) == 3